@@ -0,0 +1,144 @@
+""" Checks that seeded scaffold runs create the same rows however they are run.
+
+    python benchmarks/determinism.py [rows]
+
+    A model is scaffolded with a seed row by row, and then again with
+    --batch-size, with --workers and interrupted and resumed from a checkpoint,
+    once with the default checkpoint and once with a --commit-every run. Every
+    run has to create the same rows as the first. The model has a Unique field,
+    whose values depend on all the values before, and tubes that keep state
+    between rows. The database is an SQLite file, the workers can't share an
+    in-memory database. Exits with 1 if any run differs.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIRECTORY = tempfile.mkdtemp(prefix='scaffolding-determinism-')
+
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=['scaffolding'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3',
+                           'NAME': os.path.join(DIRECTORY, 'determinism.sqlite3')}},
+)
+
+import django
+django.setup()
+
+from django.db import connection, models
+
+import scaffolding
+from scaffolding.checkpoint import Checkpoint
+from scaffolding.management.commands.scaffold import SEED_BLOCK_SIZE, do_scaffold
+
+SEED = 7
+
+
+class DeterminismRow(models.Model):
+    number = models.IntegerField()
+    name = models.CharField(max_length=100)
+    email = models.CharField(max_length=100)
+    nickname = models.CharField(max_length=100, null=True)
+    position = models.CharField(max_length=10)
+    score = models.FloatField()
+
+    class Meta:
+        app_label = 'scaffolding'
+
+
+class Interrupted(BaseException):
+    """ Stops the run like Ctrl-C, failed transactions are only Exceptions. """
+
+
+class DeterminismRowScaffold(object):
+    # Uses up most of its values, so the replayed rows decide what is left.
+    number = scaffolding.Unique(scaffolding.RandInt(1, 3000))
+    name = scaffolding.Name(max_length=100)
+    email = scaffolding.RandomEmail()
+    nickname = scaffolding.OrNone(scaffolding.FirstName, split=0.5)
+    position = scaffolding.EveryValue(['first', 'second', 'third'])
+    score = scaffolding.RandFloat(0, 1)
+
+    # The batches to create before the run is interrupted, None runs to the end.
+    interrupt_after = None
+
+    @classmethod
+    def finalize_batch(cls, model, objects):
+        if cls.interrupt_after is not None:
+            cls.interrupt_after -= 1
+            if cls.interrupt_after < 0:
+                raise Interrupted()
+
+scaffolding.register(DeterminismRow, DeterminismRowScaffold)
+
+
+def rows():
+    # Sorted, the workers insert their shares at the same time.
+    return sorted(DeterminismRow.objects.values_list(
+        'number', 'name', 'email', 'nickname', 'position', 'score'))
+
+
+def run(count, **kwargs):
+    DeterminismRow.objects.all().delete()
+    do_scaffold('scaffolding', 'DeterminismRow', count, seed=SEED, **kwargs)
+    return rows()
+
+
+def interrupted_run(count, batches, **kwargs):
+    """ Interrupts the run after batches batches and resumes it. """
+    DeterminismRow.objects.all().delete()
+    path = os.path.join(DIRECTORY, 'checkpoint.json')
+    checkpoint = Checkpoint.create(path, [], SEED, SEED_BLOCK_SIZE)
+    DeterminismRowScaffold.interrupt_after = batches
+    try:
+        do_scaffold('scaffolding', 'DeterminismRow', count, seed=SEED, checkpoint=checkpoint, **kwargs)
+    except Interrupted:
+        pass
+    else:
+        raise AssertionError('The run was not interrupted.')
+    finally:
+        DeterminismRowScaffold.interrupt_after = None
+    do_scaffold('scaffolding', 'DeterminismRow', count, seed=SEED,
+                checkpoint=Checkpoint.load(path), **kwargs)
+    return rows()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    try:
+        with connection.schema_editor() as editor:
+            editor.create_model(DeterminismRow)
+
+        expected = run(count)
+        runs = [
+            ('batches', lambda: run(count, batch_size=100)),
+            ('workers', lambda: run(count, batch_size=100, workers=3)),
+            ('resumed', lambda: interrupted_run(count, count // 150, batch_size=100)),
+            ('resumed in transactions', lambda: interrupted_run(count, count // 150, batch_size=100,
+                                                                commit_every=300)),
+        ]
+        different = 0
+        for name, function in runs:
+            result = function()
+            if result == expected:
+                print '%-30s same rows' % name
+            else:
+                different += 1
+                changed = sum(1 for row, other in zip(result, expected) if row != other)
+                print '%-30s DIFFERENT: %s rows, %s changed' % (
+                    name, len(result), changed + abs(len(result) - len(expected)))
+    finally:
+        connection.close()
+        shutil.rmtree(DIRECTORY)
+
+    if different:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
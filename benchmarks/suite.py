@@ -0,0 +1,288 @@
+""" Benchmarks for the tubes and for whole scaffold runs.
+
+    python benchmarks/suite.py [--quick] [--save FILE] [--compare FILE] [--threshold 0.2]
+
+    Every tube of scaffolding.tubes is measured in values per second, one value
+    at a time (next) and a batch of 1000 at a time (next_batch). RandomInternetImage
+    needs the network and is left out. Tubes that fail are reported with their error.
+
+    The end-to-end runs scaffold models with different mixes of fields into an
+    in-memory SQLite database, with several row counts, row by row, with
+    --batch-size and with --raw. They are measured in rows per second.
+
+    --save writes the results to a JSON file that serves as baseline. --compare
+    compares the results with such a file and exits with 1 if anything is
+    slower than the baseline by more than --threshold (0.2 = 20%).
+"""
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=['scaffolding'],
+    USE_TZ=True,
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+)
+
+import django
+django.setup()
+
+from django.db import connection, models
+
+import scaffolding
+from scaffolding.management.commands.scaffold import do_scaffold
+
+BATCH = 1000
+START = datetime.date(2000, 1, 1)
+END = datetime.date(2020, 1, 1)
+
+
+class BenchmarkNumbers(models.Model):
+    number = models.IntegerField()
+    ratio = models.FloatField()
+    flag = models.BooleanField(default=False)
+    day = models.DateField()
+    choice = models.CharField(max_length=10)
+
+    class Meta:
+        app_label = 'scaffolding'
+
+
+class BenchmarkText(models.Model):
+    name = models.CharField(max_length=100)
+    company = models.CharField(max_length=100)
+    address = models.CharField(max_length=200)
+    email = models.CharField(max_length=100)
+    text = models.TextField()
+
+    class Meta:
+        app_label = 'scaffolding'
+
+
+class BenchmarkRelated(models.Model):
+    numbers = models.ForeignKey(BenchmarkNumbers)
+    name = models.CharField(max_length=100)
+    position = models.CharField(max_length=10)
+    created = models.DateTimeField()
+
+    class Meta:
+        app_label = 'scaffolding'
+
+
+class BenchmarkNumbersScaffold(object):
+    number = scaffolding.RandInt(1, 1000000)
+    ratio = scaffolding.RandFloat(0, 1)
+    flag = scaffolding.TrueOrFalse()
+    day = scaffolding.RandomDate(START, END)
+    choice = scaffolding.RandomValue(['a', 'b', 'c', 'd'])
+
+
+class BenchmarkTextScaffold(object):
+    name = scaffolding.Name(max_length=100)
+    company = scaffolding.CompanyName(max_length=100)
+    address = scaffolding.StreetAddress(max_length=200)
+    email = scaffolding.RandomEmail()
+    text = scaffolding.RandomLoremIpsum(paragraphs=1)
+
+
+class BenchmarkRelatedScaffold(object):
+    numbers = scaffolding.ForeignKey(BenchmarkNumbers.objects.all(), pk_only=True)
+    name = scaffolding.FirstName(max_length=100)
+    position = scaffolding.EveryValue(['first', 'second', 'third'])
+    created = scaffolding.RandomDateTime(START, END)
+
+scaffolding.register(BenchmarkNumbers, BenchmarkNumbersScaffold)
+scaffolding.register(BenchmarkText, BenchmarkTextScaffold)
+scaffolding.register(BenchmarkRelated, BenchmarkRelatedScaffold)
+
+
+def tubes():
+    """ Yields (name, function creating the tube). """
+    yield 'StaticValue', lambda: scaffolding.StaticValue(u'value')
+    yield 'RandomValue', lambda: scaffolding.RandomValue(range(100))
+    # Skewed like word frequencies, the first value is 1000 times as likely as the last.
+    yield 'WeightedChoice', lambda: scaffolding.WeightedChoice([(i, 1.0 / i) for i in range(1, 1001)])
+    yield 'EveryValue', lambda: scaffolding.EveryValue(range(100))
+    yield 'OrNone', lambda: scaffolding.OrNone(scaffolding.FirstName)
+    yield 'OrBlank', lambda: scaffolding.OrBlank(scaffolding.FirstName)
+    yield 'Unique', lambda: scaffolding.Unique(scaffolding.RandInt(1, 10 ** 12))
+    yield 'Template', lambda: scaffolding.Template(
+        ['{number} {street} Street', ('{number} High Street', 2), '{number:03d}-{code}'],
+        number=scaffolding.RandInt(1, 100), street=scaffolding.LastName(),
+        code=scaffolding.UniqueCode(max_length=6))
+    yield 'Name', lambda: scaffolding.Name()
+    yield 'FirstName', lambda: scaffolding.FirstName()
+    yield 'LastName', lambda: scaffolding.LastName()
+    yield 'ProductCategory', lambda: scaffolding.ProductCategory()
+    yield 'ProductName', lambda: scaffolding.ProductName()
+    yield 'CompanyName', lambda: scaffolding.CompanyName()
+    yield 'RealCompanyName', lambda: scaffolding.RealCompanyName()
+    yield 'StreetAddress', lambda: scaffolding.StreetAddress()
+    yield 'Noun', lambda: scaffolding.Noun()
+    yield 'Verb', lambda: scaffolding.Verb()
+    yield 'Word', lambda: scaffolding.Word()
+    yield 'RandomEmail', lambda: scaffolding.RandomEmail()
+    yield 'BookTitle', lambda: scaffolding.BookTitle()
+    yield 'LoremIpsum', lambda: scaffolding.LoremIpsum(paragraphs=1)
+    yield 'RandomLoremIpsum', lambda: scaffolding.RandomLoremIpsum(paragraphs=1)
+    yield 'RandInt', lambda: scaffolding.RandInt(1, 100)
+    yield 'RandFloat', lambda: scaffolding.RandFloat(0, 1)
+    yield 'AlwaysTrue', lambda: scaffolding.AlwaysTrue()
+    yield 'AlwaysFalse', lambda: scaffolding.AlwaysFalse()
+    yield 'TrueOrFalse', lambda: scaffolding.TrueOrFalse(true=1, false=3)
+    yield 'PlaceholderImage', lambda: scaffolding.PlaceholderImage(width=64, height=64)
+    yield 'ForeignKey', lambda: scaffolding.ForeignKey(BenchmarkNumbers.objects.all())
+    yield 'ForeignKeyOrNone', lambda: scaffolding.ForeignKeyOrNone(queryset=BenchmarkNumbers.objects.all())
+    yield 'RandomDate', lambda: scaffolding.RandomDate(START, END)
+    yield 'RandomDateTime', lambda: scaffolding.RandomDateTime(START, END)
+    yield 'UniqueCode', lambda: scaffolding.UniqueCode()
+    yield 'USCity', lambda: scaffolding.USCity()
+    yield 'UKCounty', lambda: scaffolding.UKCounty()
+    yield 'LondonBorough', lambda: scaffolding.LondonBorough()
+    yield 'UKPhone', lambda: scaffolding.UKPhone()
+    yield 'LondonPostcode', lambda: scaffolding.LondonPostcode()
+    yield 'URL', lambda: scaffolding.URL()
+    yield 'Callable', lambda: scaffolding.Callable(len, u'value')
+    yield 'OtherField', lambda: scaffolding.OtherField('name', len)
+
+
+def rate(function, units=1, min_time=0.2):
+    """ Returns how many units per second function processes. The number of
+        calls is doubled until they take min_time, the best of three runs counts.
+    """
+    number = 1
+    while True:
+        start = time.time()
+        for i in xrange(number):
+            function()
+        seconds = time.time() - start
+        if seconds >= min_time:
+            break
+        number *= 2
+    for repeat in range(2):
+        start = time.time()
+        for i in xrange(number):
+            function()
+        seconds = min(seconds, time.time() - start)
+    return number * units / max(seconds, 1e-9)
+
+
+def bench_tubes(results, min_time):
+    for name, create in tubes():
+        try:
+            tube = create()
+            results['tube.%s.next' % name] = rate(tube.next, min_time=min_time)
+            if hasattr(tube, 'next_batch'):
+                results['tube.%s.next_batch' % name] = rate(
+                    lambda: tube.next_batch(BATCH), units=BATCH, min_time=min_time)
+        except Exception as e:
+            print '%-40s failed: %s: %s' % ('tube.%s' % name, e.__class__.__name__, e)
+            continue
+        for key in ['tube.%s.next' % name, 'tube.%s.next_batch' % name]:
+            if key in results:
+                print '%-40s %14.0f values/s' % (key, results[key])
+
+
+def clear(*models_list):
+    for model in models_list:
+        model._default_manager.all().delete()
+
+
+def scaffold(model, count, **kwargs):
+    """ Returns the rows per second of a scaffold run, without its output. """
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        start = time.time()
+        do_scaffold('scaffolding', model.__name__, count, **kwargs)
+        seconds = time.time() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return count / max(seconds, 1e-9)
+
+
+def bench_scaffold(results, counts):
+    modes = [('rows', {}), ('bulk', {'batch_size': 500}), ('raw', {'batch_size': 500})]
+    modes[2][1]['raw'] = True
+    for model in [BenchmarkNumbers, BenchmarkText, BenchmarkRelated]:
+        for count in counts:
+            for mode, kwargs in modes:
+                clear(BenchmarkRelated)
+                if model is BenchmarkRelated:
+                    BenchmarkRelatedScaffold.numbers.refresh()
+                else:
+                    clear(model)
+                key = 'scaffold.%s.%s.%s' % (model.__name__, count, mode)
+                results[key] = scaffold(model, count, **kwargs)
+                print '%-40s %14.0f rows/s' % (key, results[key])
+        if model is BenchmarkNumbers:
+            # The related model needs rows to point to.
+            clear(BenchmarkNumbers)
+            scaffold(BenchmarkNumbers, 100)
+
+
+def compare(results, baseline, threshold):
+    """ Prints the change of every result against the baseline and returns the
+        names of the results that got slower by more than threshold.
+    """
+    regressions = []
+    print '\n%-40s %14s %14s %8s' % ('Benchmark', 'Baseline', 'Now', 'Change')
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        change = results[key] / baseline[key] - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(key)
+            flag = '  REGRESSION'
+        print '%-40s %14.0f %14.0f %+7.0f%%%s' % (key, baseline[key], results[key], change * 100, flag)
+    return regressions
+
+
+def main():
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('--quick', action='store_true', default=False,
+                      help='Shorter measurements and fewer rows.')
+    parser.add_option('--save', help='Write the results to this JSON file.')
+    parser.add_option('--compare', help='Compare the results with this JSON file.')
+    parser.add_option('--threshold', type='float', default=0.2,
+                      help='Slowdown that counts as regression, 0.2 = 20%.')
+    options, args = parser.parse_args()
+
+    with connection.schema_editor() as editor:
+        for model in [BenchmarkNumbers, BenchmarkText, BenchmarkRelated]:
+            editor.create_model(model)
+    scaffold(BenchmarkNumbers, 100)
+
+    results = {}
+    bench_tubes(results, 0.05 if options.quick else 0.2)
+    bench_scaffold(results, [500] if options.quick else [1000, 5000])
+
+    if options.save:
+        with open(options.save, 'w') as baseline_file:
+            json.dump({
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'results': results,
+            }, baseline_file, indent=2, sort_keys=True)
+        print '\nWrote %s' % options.save
+
+    if options.compare:
+        with open(options.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print '\n%s regressions' % len(regressions)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
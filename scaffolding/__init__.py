@@ -8,52 +8,104 @@ from django.conf import settings
 from django.utils.importlib import import_module
 
 from tubes import (Tube, Name, LoremIpsum, RandomLoremIpsum, RandInt, RandFloat, Contrib, AlwaysTrue,
-    AlwaysFalse, StaticValue, RandomValue, EveryValue, RandomInternetImage,
+    AlwaysFalse, StaticValue, RandomValue, WeightedChoice, EveryValue, RandomInternetImage, PlaceholderImage,
     ForeignKey, FirstName, LastName, ProductName, CompanyName, RealCompanyName, StreetAddress, Noun, Verb,
     Word, ProductCategory, TrueOrFalse, BookTitle, RandomDate, RandomDateTime,
-    ForeignKeyOrNone, UniqueCode, USCity, UKPhone, UKCounty, LondonBorough, LondonPostcode, URL, OrNone, OrBlank, RandomEmail,
-    Callable, OtherField
+    ForeignKeyOrNone, UniqueCode, USCity, UKPhone, UKCounty, LondonBorough, LondonPostcode, URL, OrNone, OrBlank, Unique, RandomEmail,
+    Callable, OtherField, Template
     )
 
 __all__ = ['Tube', 'Name', 'LoremIpsum', 'RandomLoremIpsum', 'RandInt', 'RandFloat', 'Contrib',
-           'AlwaysTrue', 'AlwaysFalse', 'StaticValue', 'RandomValue', 'EveryValue', 'OrNone',
-           'OrBlank', 'RandomInternetImage', 'FirstName', 'LastName', 'ProductName', 'CompanyName', 'RealCompanyName', 'StreetAddress',
+           'AlwaysTrue', 'AlwaysFalse', 'StaticValue', 'RandomValue', 'WeightedChoice', 'EveryValue', 'OrNone',
+           'OrBlank', 'Unique', 'RandomInternetImage', 'PlaceholderImage', 'FirstName', 'LastName', 'ProductName', 'CompanyName', 'RealCompanyName', 'StreetAddress',
            'Noun', 'Verb', 'Word', 'ProductCategory', 'UniqueCode', 'USCity', 'UKPhone', 'UKCounty', 'LondonBorough', 'LondonPostcode', 'URL',
            'TrueOrFalse', 'BookTitle', 'RandomDate', 'RandomDateTime', 'ForeignKeyOrNone',
-           'ForeignKey', 'register', 'scaffold_for_model', 'RandomEmail', 'Callable', 'OtherField']
+           'ForeignKey', 'register', 'unregister', 'scaffold_for_model', 'RandomEmail', 'Callable',
+           'OtherField', 'Template']
 
 
-def generic_autodiscover(module_name):
+# (app, module_name) pairs that have already been searched.
+_discovered = set()
 
-    for app in settings.INSTALLED_APPS:
-        try:
-            import_module(app)
-            app_path = sys.modules[app].__path__
-        except AttributeError:
-            continue
-        try:
-            imp.find_module(module_name, app_path)
-        except ImportError:
+def generic_autodiscover(module_name, apps=None):
+    """
+    Imports module_name from all INSTALLED_APPS (or only from apps).
+    Every app is only searched once, see reset_discovery.
+
+    """
+    for app in (settings.INSTALLED_APPS if apps is None else apps):
+        if (app, module_name) in _discovered:
             continue
-        import_module('%s.%s' % (app, module_name))
-        app_path = sys.modules['%s.%s' % (app, module_name)]
+        _discover_app(app, module_name)
+        _discovered.add((app, module_name))
+
+
+def _discover_app(app, module_name):
+    try:
+        import_module(app)
+        app_path = sys.modules[app].__path__
+    except AttributeError:
+        return
+    try:
+        imp.find_module(module_name, app_path)
+    except ImportError:
+        return
+    import_module('%s.%s' % (app, module_name))
+
+
+def reset_discovery():
+    """
+    Forgets which apps have been searched, the next lookup searches them again.
+    Modules that have been imported before are not reloaded.
+
+    """
+    _discovered.clear()
 
 
 _registry = OrderedDict()
+# 'app_label.modelname' -> model
+_label_index = {}
+
+def _model_label(model):
+    return u'%s.%s' % (model._meta.app_label, model._meta.object_name.lower())
 
 def register(model, scaffold):
     _registry[model] = scaffold
+    _label_index[_model_label(model)] = model
+
+def unregister(model):
+    del _registry[model]
+    del _label_index[_model_label(model)]
 
 def all_scaffolds():
     generic_autodiscover('scaffolds')
     return _registry
 
+def _apps_for_label(app_label):
+    return [app for app in settings.INSTALLED_APPS if app.rsplit('.', 1)[-1] == app_label]
+
 def scaffold_for_model(model):
     """
     Returns the scaffold class for a given model (if it has been registered before).
+    model can also be an 'app_label.ModelName' string.
+
+    Only the scaffolds module of the model's app is loaded at first, the other apps
+    are searched if the scaffold hasn't been registered there.
 
     """
-    # Load scaffold modules of all INSTALLED_APPS
-    generic_autodiscover('scaffolds')
+    if isinstance(model, basestring):
+        label = model.lower()
+        app_label = label.partition('.')[0]
+        if label not in _label_index:
+            generic_autodiscover('scaffolds', apps=_apps_for_label(app_label))
+        if label not in _label_index:
+            generic_autodiscover('scaffolds')
+        return _registry[_label_index[label]]
+
+    if model not in _registry:
+        generic_autodiscover('scaffolds', apps=_apps_for_label(model._meta.app_label))
+    if model not in _registry:
+        # Load scaffold modules of all INSTALLED_APPS
+        generic_autodiscover('scaffolds')
 
     return _registry[model]
@@ -0,0 +1,81 @@
+""" Progress records of scaffold runs, so that an interrupted run can be resumed.
+
+    A checkpoint is a JSON file with the arguments and the seed of the run and,
+    per model, the number of rows in its table before the run started, the
+    number of rows created or rolled back so far and whether the model is done.
+    The tubes of a seeded run can be moved to any row, so the seed and the row
+    count are all that's needed to continue with the same values.
+"""
+import json
+import os
+
+
+class Checkpoint(object):
+
+    def __init__(self, path, state):
+        self.path = path
+        self.state = state
+
+    @classmethod
+    def create(cls, path, args, seed, block_size):
+        return cls(path, {'args': args, 'seed': seed, 'block_size': block_size, 'models': {}})
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as checkpoint_file:
+            return cls(path, json.load(checkpoint_file))
+
+    @property
+    def seed(self):
+        return self.state['seed']
+
+    def save(self):
+        # Replace the file in one step, a crash can't leave a half written checkpoint.
+        temp_path = '%s.tmp' % self.path
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(self.state, checkpoint_file, indent=2, sort_keys=True)
+        os.rename(temp_path, self.path)
+
+    def label(self, model):
+        return u'%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+    def model_state(self, model):
+        return self.state['models'].get(self.label(model))
+
+    def start(self, model, count, last_pk=None):
+        """ Records the table size before the first row of model is created. """
+        self.state['models'][self.label(model)] = {
+            'count': count,
+            'initial_rows': model._default_manager.count(),
+            'last_pk': last_pk,
+            'rows': 0,
+            'failed_rows': 0,
+            'done': False,
+        }
+        self.save()
+
+    def next_row(self, model):
+        """ Returns the row of model the run continues with. """
+        model_state = self.model_state(model)
+        # The table is the record of what has been committed, the checkpoint may
+        # have been written a few rows before the run stopped. Rows of transactions
+        # that were rolled back are not in the table.
+        model_state['rows'] = (model._default_manager.count() - model_state['initial_rows']
+                               + model_state['failed_rows'])
+        self.save()
+        return model_state['rows']
+
+    def is_done(self, model):
+        return bool(self.model_state(model) and self.model_state(model)['done'])
+
+    def update(self, model, rows):
+        self.model_state(model)['rows'] = rows
+        self.save()
+
+    def add_failed(self, model, rows):
+        self.model_state(model)['failed_rows'] += rows
+        self.save()
+
+    def finish(self, model):
+        self.model_state(model)['done'] = True
+        self.save()
@@ -0,0 +1,126 @@
+""" Writers that stream scaffolded objects into files instead of the database.
+
+    .json  A Django fixture, loadable with manage.py loaddata.
+    .jsonl The same objects, one per line.
+    .csv   One row per object with a header of the column names, e.g. for
+           PostgreSQL's COPY table (columns) FROM ... WITH CSV HEADER.
+           Auto-incremented primary keys are left out. Only works for a single model.
+
+    The objects aren't saved, so their many-to-many fields are empty.
+"""
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Serializer
+from django.db import models
+
+import scaffolding
+from scaffolding.raw import copy_value
+
+
+def check_models(path, models_list):
+    """ Raises ValueError if the objects of models_list can't be written to path. """
+    problems = []
+    for model in models_list:
+        if model._meta.parents:
+            problems.append('%s uses multi-table inheritance' % model.__name__)
+        scaffold = scaffolding.scaffold_for_model(model)
+        for field in model._meta.many_to_many:
+            if getattr(scaffold, field.name, None) is not None:
+                problems.append('%s.%s is a many-to-many field' % (model.__name__, field.name))
+    if os.path.splitext(path)[1].lower() == '.csv' and len(models_list) > 1:
+        problems.append('a CSV file can only contain objects of one model')
+    if problems:
+        raise ValueError('Can\'t write %s: %s.' % (path, ', '.join(problems)))
+
+
+class UnsavedSerializer(Serializer):
+    """ Serializes objects that aren't saved, whose relations can't be read. """
+
+    def handle_m2m_field(self, obj, field):
+        if field.rel.through._meta.auto_created:
+            self._current[field.name] = []
+
+
+class JSONLinesWriter(object):
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.serializer = UnsavedSerializer()
+
+    def write(self, objects):
+        for data in self.serializer.serialize(objects):
+            self.write_object(json.dumps(data, cls=DjangoJSONEncoder))
+
+    def write_object(self, data):
+        self.file.write(data)
+        self.file.write('\n')
+
+    def close(self):
+        self.file.close()
+
+
+class JSONWriter(JSONLinesWriter):
+    """ Writes the objects as a JSON list without keeping them in memory. """
+
+    def __init__(self, path):
+        super(JSONWriter, self).__init__(path)
+        self.file.write('[')
+        self.separator = '\n'
+
+    def write_object(self, data):
+        self.file.write(self.separator)
+        self.file.write(data)
+        self.separator = ',\n'
+
+    def close(self):
+        self.file.write('\n]\n')
+        super(JSONWriter, self).close()
+
+
+class CSVWriter(object):
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.model = None
+        self.fields = None
+
+    def write(self, objects):
+        for obj in objects:
+            if self.model is None:
+                self.model = obj.__class__
+                self.fields = [field for field in self.model._meta.local_concrete_fields
+                               if not isinstance(field, models.AutoField)]
+                self.write_row([field.column for field in self.fields])
+            elif obj.__class__ is not self.model:
+                raise ValueError('A CSV file can only contain objects of one model.')
+            self.write_row([self.to_string(field, obj) for field in self.fields])
+
+    def write_row(self, values):
+        # Everything but NULL is quoted, an empty unquoted value is NULL for COPY.
+        self.file.write(','.join(copy_value(value) for value in values))
+        self.file.write('\n')
+
+    def to_string(self, field, obj):
+        if getattr(obj, field.attname) is None:
+            return None
+        return field.value_to_string(obj)
+
+    def close(self):
+        self.file.close()
+
+
+WRITERS = {
+    '.json': JSONWriter,
+    '.jsonl': JSONLinesWriter,
+    '.csv': CSVWriter,
+}
+
+
+def get_writer(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError('Unknown output format %s, use one of %s.' % (
+            extension, ', '.join(sorted(WRITERS))))
+    return WRITERS[extension](path)
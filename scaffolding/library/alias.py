@@ -0,0 +1,71 @@
+""" Walker's alias method: draws the index i with the probability
+    weights[i] / sum(weights), in constant time whatever the number of weights.
+
+    Every index gets a column of height 1, split between the index itself (with
+    the probability of probabilities[i]) and an alias. A draw picks a column
+    and a height with one random number.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class AliasTable(object):
+
+    def __init__(self, weights):
+        weights = [float(weight) for weight in weights]
+        if not weights:
+            raise ValueError('There are no weights.')
+        if min(weights) < 0:
+            raise ValueError('The weights can\'t be negative.')
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError('The weights add up to 0.')
+
+        self.size = size = len(weights)
+        self.probabilities = [1.0] * size
+        self.aliases = range(size)
+        # Vose's variant: columns below 1 are filled up from the ones above 1.
+        scaled = [weight * size / total for weight in weights]
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+        # What's left is 1 apart from rounding errors.
+        self.arrays = None
+
+    def sample(self, random):
+        """ Draws an index with random, the random module or a Random instance. """
+        column = random.random() * self.size
+        index = int(column)
+        if column - index < self.probabilities[index]:
+            return index
+        return self.aliases[index]
+
+    def sample_batch(self, random, n):
+        """ Draws n indexes. """
+        probabilities, aliases, size = self.probabilities, self.aliases, self.size
+        indexes = []
+        append = indexes.append
+        for r in [random.random() for i in xrange(n)]:
+            column = r * size
+            index = int(column)
+            append(index if column - index < probabilities[index] else aliases[index])
+        return indexes
+
+    def sample_numpy(self, n):
+        """ Draws n indexes with the generator of numpy, as an array. """
+        if self.arrays is None:
+            self.arrays = numpy.array(self.probabilities), numpy.array(self.aliases)
+        probabilities, aliases = self.arrays
+        columns = numpy.random.random(n) * self.size
+        indexes = columns.astype(numpy.intp)
+        return numpy.where(columns - indexes < probabilities[indexes], indexes, aliases[indexes])
@@ -0,0 +1,31 @@
+""" A Bloom filter: a set of byte strings in a fixed amount of memory that can
+    only tell whether a string has maybe been added. Strings that have been
+    added are always found, others are found with a probability of error_rate.
+"""
+import hashlib
+import math
+import struct
+
+
+class BloomFilter(object):
+
+    def __init__(self, capacity, error_rate=0.01):
+        # About 1.2 bytes per string for an error rate of 1%.
+        self.size = int(-capacity * math.log(error_rate) / math.log(2) ** 2) + 1
+        self.hashes = max(1, int(round(self.size / float(capacity) * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        first, second = struct.unpack('<QQ', hashlib.md5(key).digest())
+        return [(first + i * second) % self.size for i in xrange(self.hashes)]
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        for position in self.positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
@@ -93,14 +93,17 @@ ADJECTIVES = (
 )
 
 class Title(object):
+    # Replaced by the random generator of a seeded BookTitle tube.
+    random = random
+
     def __iter__(self):
         return self
 
     def make_title(self):
-        adj = random.choice(ADJECTIVES)
-        noun = random.choice(NOUNS)
-        noun2 = random.choice(NOUNS)
-        return random.choice([
+        adj = self.random.choice(ADJECTIVES)
+        noun = self.random.choice(NOUNS)
+        noun2 = self.random.choice(NOUNS)
+        return self.random.choice([
             lambda: u"%s %s" % (adj, noun),
             lambda: u"The %s %s" % (adj, noun),
             lambda: u"%s of %s" % (noun, noun2),
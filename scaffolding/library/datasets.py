@@ -0,0 +1,118 @@
+""" Process wide cache for the data files of the library.
+    Every file is parsed at most once and returned as a tuple.
+
+    The large lists are compiled vocabularies instead, see vocabulary. They are
+    compiled next to their source on first use (or by the compile_vocabularies
+    command) and are recompiled when the source is newer. If the package
+    directory isn't writable they are compiled to TEMP_PATH.
+"""
+import codecs
+import csv
+import functools
+import os
+import tempfile
+from collections import OrderedDict
+
+from scaffolding.library.vocabulary import Vocabulary, compile_vocabulary
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+TEMP_PATH = os.path.join(tempfile.gettempdir(), 'scaffolding-vocabularies')
+
+_cache = {}
+
+
+def dataset(loader):
+    """ Memoises the result of loader per set of arguments. """
+    @functools.wraps(loader)
+    def wrapper(*args):
+        key = (loader.__name__,) + args
+        try:
+            return _cache[key]
+        except KeyError:
+            data = _cache[key] = tuple(loader(*args))
+            return data
+    return wrapper
+
+
+def clear_cache():
+    """ Drops all loaded datasets, they are parsed again on the next access. """
+    _cache.clear()
+
+
+def top_urls(prefix=''):
+    return vocabulary('top_urls', unicode(prefix))
+
+
+def read_top_urls():
+    with open(os.path.join(PATH, 'top-10kURL.csv'), 'rb') as csvfile:
+        reader = csv.reader(csvfile, delimiter=',', quotechar='"')
+        return [unicode(row[0], 'utf-8') for row in reader]
+
+
+def us_cities():
+    return vocabulary('us_cities')
+
+
+def read_us_cities():
+    with open(os.path.join(PATH, 'US_Top5000Population.csv'), 'rb') as csvfile:
+        reader = csv.reader(csvfile, delimiter=',', quotechar='"')
+        return [unicode('%s, %s' % (row[0], row[1].strip()), 'utf-8') for row in reader]
+
+
+@dataset
+def uk_counties():
+    with open(os.path.join(PATH, 'uk_counties.txt'), 'rb') as txtfile:
+        return txtfile.readlines()
+
+
+@dataset
+def london_boroughs():
+    with open(os.path.join(PATH, 'london_boroughs.txt'), 'rb') as txtfile:
+        return txtfile.readlines()
+
+
+def companies():
+    return vocabulary('companies')
+
+
+def read_companies():
+    with codecs.open(os.path.join(PATH, 'companies.txt'), encoding='utf-8', mode='rb') as txtfile:
+        return [line.rstrip() for line in txtfile]
+
+
+# name => (source file, function that reads the values from it)
+VOCABULARIES = OrderedDict([
+    ('top_urls', ('top-10kURL.csv', read_top_urls)),
+    ('us_cities', ('US_Top5000Population.csv', read_us_cities)),
+    ('companies', ('companies.txt', read_companies)),
+])
+
+
+def vocabulary(name, prefix=u''):
+    """ The compiled vocabulary name, with prefix in front of its values. """
+    key = ('vocabulary', name, prefix)
+    if key not in _cache:
+        _cache[key] = Vocabulary(build_vocabulary(name), prefix)
+    return _cache[key]
+
+
+def build_vocabulary(name, force=False):
+    """ Compiles the vocabulary name unless it is up to date or force is set.
+        Returns the path of the compiled file.
+    """
+    source_file, read = VOCABULARIES[name]
+    source_time = os.path.getmtime(os.path.join(PATH, source_file))
+    paths = [os.path.join(directory, '%s.vocab' % name) for directory in [PATH, TEMP_PATH]]
+    if not force:
+        for path in paths:
+            if os.path.exists(path) and os.path.getmtime(path) >= source_time:
+                return path
+    values = read()
+    try:
+        compile_vocabulary(values, paths[0])
+        return paths[0]
+    except (IOError, OSError):
+        if not os.path.isdir(TEMP_PATH):
+            os.makedirs(TEMP_PATH)
+        compile_vocabulary(values, paths[1])
+        return paths[1]
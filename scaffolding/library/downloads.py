@@ -0,0 +1,116 @@
+""" An on-disk cache for downloaded files.
+    Files are stored under the SHA1 hash of their URL. When the files in the
+    cache directory add up to more than max_size the least recently used ones
+    are deleted. The size is taken from the directory, so processes sharing it
+    share the limit too. The directory is only created by the first download.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import urllib2
+import urlparse
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'scaffolding-downloads')
+
+
+class DownloadCache(object):
+
+    def __init__(self, cache_dir=None, max_size=100 * 1024 * 1024):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+    def _files(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isfile(path) and not name.startswith('.'):
+                yield path
+
+    def _sizes(self):
+        """ Returns (mtime, size, path) of the cached files, files that other
+            processes delete meanwhile are left out.
+        """
+        sizes = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            sizes.append((stat.st_mtime, stat.st_size, path))
+        return sizes
+
+    def size(self):
+        """ The size of the files in the cache directory. """
+        return sum(size for mtime, size, path in self._sizes())
+
+    def path(self, url):
+        extension = os.path.splitext(urlparse.urlparse(url).path)[1][:10]
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + extension)
+
+    def open(self, url):
+        """ Returns the cached file for url opened for reading, downloading it if
+            necessary. An open file stays readable even if it is evicted later.
+        """
+        path = self.path(url)
+        with self.lock:
+            if os.path.exists(path):
+                # Mark the file as recently used.
+                os.utime(path, None)
+                return open(path, 'rb')
+
+        try:
+            os.makedirs(self.cache_dir)
+        except OSError:
+            # Another process may have created it.
+            if not os.path.isdir(self.cache_dir):
+                raise
+        handle, temp_path = tempfile.mkstemp(prefix='.', dir=self.cache_dir)
+        os.close(handle)
+        try:
+            # urlopen raises HTTPError for error responses, their pages aren't cached.
+            response = urllib2.urlopen(url)
+            try:
+                with open(temp_path, 'wb') as temp_file:
+                    shutil.copyfileobj(response, temp_file)
+            finally:
+                response.close()
+        except:
+            os.remove(temp_path)
+            raise
+
+        with self.lock:
+            if os.path.exists(path):
+                # Another thread downloaded the same URL in the meantime.
+                os.remove(temp_path)
+                return open(path, 'rb')
+            os.rename(temp_path, path)
+            cached_file = open(path, 'rb')
+            self._evict(keep=path)
+        return cached_file
+
+    def _evict(self, keep):
+        files = sorted(self._sizes())
+        total = sum(size for mtime, size, path in files)
+        for mtime, size, path in files:
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                # Evicted by another process.
+                pass
+            total -= size
+
+    def clear(self):
+        with self.lock:
+            for path in self._files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
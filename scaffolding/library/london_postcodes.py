@@ -1 +1,48 @@
-postcodes = ['BR1', 'BR1', 'BR1', 'BR1', 'BR1', 'BR2', 'BR2', 'BR2', 'BR2', 'BR2', 'BR3', 'BR3', 'BR3', 'BR3', 'BR3', 'BR3', 'BR4', 'BR4', 'BR5', 'BR5', 'BR5', 'BR5', 'BR6', 'BR6', 'BR6', 'BR6', 'BR6', 'BR7', 'BR7', 'BR8', 'BR8', 'CR0', 'CR0', 'CR0', 'CR0', 'CR0', 'CR0', 'CR0', 'CR0', 'CR0', 'CR0', 'CR2', 'CR2', 'CR2', 'CR2', 'CR2', 'CR3', 'CR3', 'CR3', 'CR4', 'CR4', 'CR4', 'CR4', 'CR5', 'CR5', 'CR5', 'CR6', 'CR7', 'CR7', 'CR7', 'CR8', 'CR8', 'CR8', 'CR8', 'CR8', 'CR9', 'CR9', 'CR9', 'DA1', 'DA1', 'DA1', 'DA1', 'DA1', 'DA10', 'DA11', 'DA11', 'DA12', 'DA12', 'DA12', 'DA12', 'DA14', 'DA14', 'DA14', 'DA15', 'DA15', 'DA15', 'DA16', 'DA16', 'DA16', 'DA17', 'DA17', 'DA18', 'DA2', 'DA2', 'DA2', 'DA3', 'DA4', 'DA4', 'DA5', 'DA5', 'DA5', 'DA6', 'DA6', 'DA7', 'DA7', 'DA7', 'DA8', 'DA8', 'DA8', 'DA9', 'E1', 'E1', 'E1', 'E1', 'E1', 'E1', 'E1', 'E1', 'E1', 'E1', 'E10', 'E10', 'E10', 'E11', 'E11', 'E11', 'E11', 'E12', 'E12', 'E13', 'E13', 'E13', 'E14', 'E14', 'E14', 'E14', 'E14', 'E14', 'E14', 'E14', 'E14', 'E15', 'E15', 'E15', 'E15', 'E16', 'E16', 'E16', 'E16', 'E17', 'E17', 'E17', 'E17', 'E17', 'E17', 'E17', 'E18', 'E18', 'E1', 'E1', 'E1', 'E2', 'E2', 'E2', 'E2', 'E2', 'E2', 'E3', 'E3', 'E3', 'E3', 'E4', 'E4', 'E4', 'E4', 'E5', 'E5', 'E5', 'E6', 'E6', 'E6', 'E6', 'E6', 'E6', 'E6', 'E7', 'E7', 'E7', 'E8', 'E8', 'E8', 'E8', 'E9', 'E9', 'E9', 'E9', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC1', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC2', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC3', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EC4', 'EN1', 'EN1', 'EN1', 'EN1', 'EN10', 'EN10', 'EN11', 'EN11', 'EN11', 'EN2', 'EN2', 'EN2', 'EN2', 'EN2', 'EN3', 'EN3', 'EN3', 'EN3', 'EN3', 'EN4', 'EN4', 'EN4', 'EN5', 'EN5', 'EN5', 'EN5', 'EN5', 'EN6', 'EN6', 'EN6', 'EN6', 'EN6', 'EN7', 'EN7', 'EN8', 'EN8', 'EN8', 'EN8', 'EN9', 'EN9', 'HA0', 'HA0', 'HA0', 'HA0', 'HA1', 'HA1', 'HA1', 'HA1', 'HA2', 'HA2', 'HA2', 'HA2', 'HA2', 'HA3', 'HA3', 'HA3', 'HA3', 'HA3', 'HA3', 'HA4', 'HA4', 'HA4', 'HA4', 'HA4', 'HA5', 'HA5', 'HA5', 'HA5', 'HA5', 'HA6', 'HA6', 'HA6', 'HA7', 'HA7', 'HA7', 'HA7', 'HA8', 'HA8', 'HA8', 'HA8', 'HA8', 'HA8', 'HA9', 'HA9', 'HA9', 'HA9', 'HA9', 'IG1', 'IG1', 'IG1', 'IG1', 'IG10', 'IG10', 'IG10', 'IG10', 'IG11', 'IG11', 'IG11', 'IG11', 'IG2', 'IG2', 'IG3', 'IG3', 'IG4', 'IG5', 'IG6', 'IG6', 'IG6', 'IG7', 'IG7', 'IG7', 'IG8', 'IG8', 'IG8', 'IG8', 'IG9', 'IG9', 'KT1', 'KT1', 'KT1', 'KT1', 'KT10', 'KT10', 'KT10', 'KT11', 'KT11', 'KT11', 'KT12', 'KT12', 'KT12', 'KT12', 'KT12', 'KT13', 'KT13', 'KT13', 'KT14', 'KT14', 'KT15', 'KT15', 'KT15', 'KT16', 'KT16', 'KT16', 'KT17', 'KT17', 'KT17', 'KT17', 'KT18', 'KT18', 'KT19', 'KT19', 'KT19', 'KT19', 'KT2', 'KT2', 'KT2', 'KT20', 'KT20', 'KT20', 'KT21', 'KT21', 'KT22', 'KT22', 'KT22', 'KT22', 'KT23', 'KT3', 'KT3', 'KT3', 'KT3', 'KT4', 'KT4', 'KT5', 'KT5', 'KT6', 'KT6', 'KT6', 'KT6', 'KT7', 'KT8', 'KT8', 'KT8', 'KT8', 'KT9', 'KT9', 'N1', 'N1', 'N1', 'N1', 'N1', 'N1', 'N1', 'N1', 'N1', 'N1', 'N10', 'N10', 'N10', 'N11', 'N11', 'N11', 'N12', 'N12', 'N12', 'N12', 'N13', 'N13', 'N13', 'N14', 'N14', 'N14', 'N14', 'N15', 'N15', 'N15', 'N15', 'N16', 'N16', 'N16', 'N16', 'N16', 'N16', 'N17', 'N17', 'N17', 'N17', 'N17', 'N18', 'N18', 'N18', 'N19', 'N19', 'N19', 'N2', 'N2', 'N2', 'N20', 'N20', 'N20', 'N21', 'N21', 'N21', 'N22', 'N22', 'N22', 'N22', 'N22', 'N3', 'N3', 'N3', 'N4', 'N4', 'N4', 'N4', 'N5', 'N5', 'N6', 'N6', 'N6', 'N7', 'N7', 'N7', 'N7', 'N7', 'N8', 'N8', 'N8', 'N8', 'N9', 'N9', 'N9', 'N9', 'NW1', 'NW1', 'NW1', 'NW1', 'NW1', 'NW1', 'NW1', 'NW1', 'NW1', 'NW1', 'NW10', 'NW10', 'NW10', 'NW10', 'NW10', 'NW10', 'NW10', 'NW10', 'NW10', 'NW10', 'NW11', 'NW11', 'NW11', 'NW11', 'NW11', 'NW2', 'NW2', 'NW2', 'NW2', 'NW2', 'NW2', 'NW2', 'NW3', 'NW3', 'NW3', 'NW3', 'NW3', 'NW3', 'NW3', 'NW4', 'NW4', 'NW4', 'NW4', 'NW5', 'NW5', 'NW5', 'NW5', 'NW6', 'NW6', 'NW6', 'NW6', 'NW6', 'NW6', 'NW6', 'NW7', 'NW7', 'NW7', 'NW7', 'NW8', 'NW8', 'NW8', 'NW8', 'NW8', 'NW9', 'NW9', 'NW9', 'NW9', 'NW9', 'NW9', 'RM1', 'RM1', 'RM1', 'RM1', 'RM10', 'RM10', 'RM10', 'RM11', 'RM11', 'RM11', 'RM12', 'RM12', 'RM12', 'RM13', 'RM13', 'RM13', 'RM14', 'RM14', 'RM15', 'RM15', 'RM15', 'RM16', 'RM16', 'RM16', 'RM16', 'RM17', 'RM17', 'RM18', 'RM18', 'RM19', 'RM2', 'RM2', 'RM20', 'RM3', 'RM3', 'RM3', 'RM3', 'RM4', 'RM5', 'RM5', 'RM6', 'RM6', 'RM6', 'RM7', 'RM7', 'RM7', 'RM7', 'RM8', 'RM8', 'RM8', 'RM8', 'RM9', 'RM9', 'RM9', 'SE1', 'SE1', 'SE1', 'SE1', 'SE1', 'SE1', 'SE1', 'SE1', 'SE1', 'SE1', 'SE10', 'SE10', 'SE10', 'SE11', 'SE11', 'SE11', 'SE12', 'SE12', 'SE12', 'SE13', 'SE13', 'SE13', 'SE14', 'SE14', 'SE15', 'SE15', 'SE15', 'SE15', 'SE15', 'SE15', 'SE16', 'SE16', 'SE16', 'SE16', 'SE16', 'SE16', 'SE16', 'SE17', 'SE17', 'SE17', 'SE18', 'SE18', 'SE18', 'SE18', 'SE18', 'SE18', 'SE18', 'SE19', 'SE19', 'SE19', 'SE2', 'SE2', 'SE20', 'SE20', 'SE21', 'SE21', 'SE22', 'SE22', 'SE22', 'SE23', 'SE23', 'SE23', 'SE24', 'SE24', 'SE25', 'SE25', 'SE25', 'SE26', 'SE26', 'SE26', 'SE27', 'SE27', 'SE28', 'SE28', 'SE3', 'SE3', 'SE3', 'SE3', 'SE4', 'SE4', 'SE5', 'SE5', 'SE5', 'SE5', 'SE6', 'SE6', 'SE6', 'SE6', 'SE7', 'SE7', 'SE8', 'SE8', 'SE8', 'SE9', 'SE9', 'SE9', 'SE9', 'SE9', 'SE9', 'SM1', 'SM1', 'SM1', 'SM1', 'SM2', 'SM2', 'SM2', 'SM3', 'SM3', 'SM4', 'SM4', 'SM4', 'SM5', 'SM5', 'SM5', 'SM5', 'SM6', 'SM6', 'SM6', 'SM6', 'SM7', 'SM7', 'SM7', 'SW10', 'SW10', 'SW11', 'SW11', 'SW11', 'SW11', 'SW11', 'SW11', 'SW12', 'SW12', 'SW12', 'SW13', 'SW13', 'SW13', 'SW14', 'SW14', 'SW15', 'SW15', 'SW15', 'SW15', 'SW15', 'SW15', 'SW16', 'SW16', 'SW16', 'SW16', 'SW16', 'SW16', 'SW17', 'SW17', 'SW17', 'SW17', 'SW17', 'SW18', 'SW18', 'SW18', 'SW18', 'SW18', 'SW19', 'SW19', 'SW19', 'SW19', 'SW19', 'SW19', 'SW19', 'SW19', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW1', 'SW2', 'SW2', 'SW2', 'SW2', 'SW2', 'SW20', 'SW20', 'SW20', 'SW3', 'SW3', 'SW3', 'SW3', 'SW3', 'SW3', 'SW4', 'SW4', 'SW4', 'SW4', 'SW4', 'SW5', 'SW5', 'SW6', 'SW6', 'SW6', 'SW6', 'SW6', 'SW6', 'SW6', 'SW7', 'SW7', 'SW7', 'SW7', 'SW7', 'SW8', 'SW8', 'SW8', 'SW8', 'SW8', 'SW9', 'SW9', 'SW9', 'SW9', 'SW9', 'TN14', 'TN16', 'TW1', 'TW1', 'TW1', 'TW1', 'TW10', 'TW10', 'TW10', 'TW11', 'TW11', 'TW11', 'TW12', 'TW12', 'TW12', 'TW13', 'TW13', 'TW13', 'TW13', 'TW14', 'TW14', 'TW14', 'TW15', 'TW15', 'TW15', 'TW16', 'TW16', 'TW16', 'TW17', 'TW17', 'TW17', 'TW18', 'TW18', 'TW18', 'TW18', 'TW19', 'TW19', 'TW19', 'TW2', 'TW2', 'TW2', 'TW20', 'TW20', 'TW20', 'TW3', 'TW3', 'TW3', 'TW3', 'TW4', 'TW4', 'TW4', 'TW5', 'TW5', 'TW6', 'TW6', 'TW6', 'TW7', 'TW7', 'TW7', 'TW7', 'TW8', 'TW8', 'TW8', 'TW9', 'TW9', 'TW9', 'TW9', 'UB1', 'UB1', 'UB1', 'UB10', 'UB10', 'UB10', 'UB11', 'UB2', 'UB2', 'UB3', 'UB3', 'UB3', 'UB3', 'UB3', 'UB4', 'UB4', 'UB4', 'UB5', 'UB5', 'UB5', 'UB6', 'UB6', 'UB6', 'UB6', 'UB7', 'UB7', 'UB7', 'UB7', 'UB8', 'UB8', 'UB8', 'UB9', 'UB9', 'UB9', 'W10', 'W10', 'W10', 'W11', 'W11', 'W11', 'W11', 'W12', 'W12', 'W12', 'W12', 'W13', 'W13', 'W13', 'W14', 'W14', 'W14', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W1', 'W2', 'W2', 'W2', 'W2', 'W2', 'W2', 'W3', 'W3', 'W3', 'W3', 'W3', 'W4', 'W4', 'W4', 'W4', 'W4', 'W5', 'W5', 'W5', 'W5', 'W5', 'W6', 'W6', 'W6', 'W6', 'W7', 'W7', 'W7', 'W8', 'W8', 'W8', 'W8', 'W9', 'W9', 'W9', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC1', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'WC2', 'RM14', 'CR9', 'W1', 'W1', 'E20', 'CR9', 'CR9', 'N1']
\ No newline at end of file
+# The postcode districts of London with their weights.
+POSTCODES = [
+    ('BR1', 5), ('BR2', 5), ('BR3', 6), ('BR4', 2), ('BR5', 4), ('BR6', 5), ('BR7', 2), ('BR8', 2),
+    ('CR0', 10), ('CR2', 5), ('CR3', 3), ('CR4', 4), ('CR5', 3), ('CR6', 1), ('CR7', 3),
+    ('CR8', 5), ('CR9', 6),
+    ('DA1', 5), ('DA10', 1), ('DA11', 2), ('DA12', 4), ('DA14', 3), ('DA15', 3), ('DA16', 3),
+    ('DA17', 2), ('DA18', 1), ('DA2', 3), ('DA3', 1), ('DA4', 2), ('DA5', 3), ('DA6', 2),
+    ('DA7', 3), ('DA8', 3), ('DA9', 1),
+    ('E1', 13), ('E10', 3), ('E11', 4), ('E12', 2), ('E13', 3), ('E14', 9), ('E15', 4), ('E16', 4),
+    ('E17', 7), ('E18', 2), ('E2', 6), ('E3', 4), ('E4', 4), ('E5', 3), ('E6', 7), ('E7', 3),
+    ('E8', 4), ('E9', 4), ('E20', 1),
+    ('EC1', 32), ('EC2', 26), ('EC3', 29), ('EC4', 30),
+    ('EN1', 4), ('EN10', 2), ('EN11', 3), ('EN2', 5), ('EN3', 5), ('EN4', 3), ('EN5', 5),
+    ('EN6', 5), ('EN7', 2), ('EN8', 4), ('EN9', 2),
+    ('HA0', 4), ('HA1', 4), ('HA2', 5), ('HA3', 6), ('HA4', 5), ('HA5', 5), ('HA6', 3), ('HA7', 4),
+    ('HA8', 6), ('HA9', 5),
+    ('IG1', 4), ('IG10', 4), ('IG11', 4), ('IG2', 2), ('IG3', 2), ('IG4', 1), ('IG5', 1),
+    ('IG6', 3), ('IG7', 3), ('IG8', 4), ('IG9', 2),
+    ('KT1', 4), ('KT10', 3), ('KT11', 3), ('KT12', 5), ('KT13', 3), ('KT14', 2), ('KT15', 3),
+    ('KT16', 3), ('KT17', 4), ('KT18', 2), ('KT19', 4), ('KT2', 3), ('KT20', 3), ('KT21', 2),
+    ('KT22', 4), ('KT23', 1), ('KT3', 4), ('KT4', 2), ('KT5', 2), ('KT6', 4), ('KT7', 1),
+    ('KT8', 4), ('KT9', 2),
+    ('N1', 11), ('N10', 3), ('N11', 3), ('N12', 4), ('N13', 3), ('N14', 4), ('N15', 4), ('N16', 6),
+    ('N17', 5), ('N18', 3), ('N19', 3), ('N2', 3), ('N20', 3), ('N21', 3), ('N22', 5), ('N3', 3),
+    ('N4', 4), ('N5', 2), ('N6', 3), ('N7', 5), ('N8', 4), ('N9', 4),
+    ('NW1', 10), ('NW10', 10), ('NW11', 5), ('NW2', 7), ('NW3', 7), ('NW4', 4), ('NW5', 4),
+    ('NW6', 7), ('NW7', 4), ('NW8', 5), ('NW9', 6),
+    ('RM1', 4), ('RM10', 3), ('RM11', 3), ('RM12', 3), ('RM13', 3), ('RM14', 3), ('RM15', 3),
+    ('RM16', 4), ('RM17', 2), ('RM18', 2), ('RM19', 1), ('RM2', 2), ('RM20', 1), ('RM3', 4),
+    ('RM4', 1), ('RM5', 2), ('RM6', 3), ('RM7', 4), ('RM8', 4), ('RM9', 3),
+    ('SE1', 10), ('SE10', 3), ('SE11', 3), ('SE12', 3), ('SE13', 3), ('SE14', 2), ('SE15', 6),
+    ('SE16', 7), ('SE17', 3), ('SE18', 7), ('SE19', 3), ('SE2', 2), ('SE20', 2), ('SE21', 2),
+    ('SE22', 3), ('SE23', 3), ('SE24', 2), ('SE25', 3), ('SE26', 3), ('SE27', 2), ('SE28', 2),
+    ('SE3', 4), ('SE4', 2), ('SE5', 4), ('SE6', 4), ('SE7', 2), ('SE8', 3), ('SE9', 6),
+    ('SM1', 4), ('SM2', 3), ('SM3', 2), ('SM4', 3), ('SM5', 4), ('SM6', 4), ('SM7', 3),
+    ('SW10', 2), ('SW11', 6), ('SW12', 3), ('SW13', 3), ('SW14', 2), ('SW15', 6), ('SW16', 6),
+    ('SW17', 5), ('SW18', 5), ('SW19', 8), ('SW1', 24), ('SW2', 5), ('SW20', 3), ('SW3', 6),
+    ('SW4', 5), ('SW5', 2), ('SW6', 7), ('SW7', 5), ('SW8', 5), ('SW9', 5),
+    ('TN14', 1), ('TN16', 1),
+    ('TW1', 4), ('TW10', 3), ('TW11', 3), ('TW12', 3), ('TW13', 4), ('TW14', 3), ('TW15', 3),
+    ('TW16', 3), ('TW17', 3), ('TW18', 4), ('TW19', 3), ('TW2', 3), ('TW20', 3), ('TW3', 4),
+    ('TW4', 3), ('TW5', 2), ('TW6', 3), ('TW7', 4), ('TW8', 3), ('TW9', 4),
+    ('UB1', 3), ('UB10', 3), ('UB11', 1), ('UB2', 2), ('UB3', 5), ('UB4', 3), ('UB5', 3),
+    ('UB6', 4), ('UB7', 4), ('UB8', 3), ('UB9', 3),
+    ('W10', 3), ('W11', 4), ('W12', 4), ('W13', 3), ('W14', 3), ('W1', 66), ('W2', 6), ('W3', 5),
+    ('W4', 5), ('W5', 5), ('W6', 4), ('W7', 3), ('W8', 4), ('W9', 3),
+    ('WC1', 20), ('WC2', 20),
+]
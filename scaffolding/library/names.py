@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
-import os
 import random
-import codecs
+
+from scaffolding.library import datasets
 
 ENGLISH_MALE_NAMES = ['Jacob', 'Ethan', 'Michael', 'Alexander', 'William', 'Joshua', 'Daniel',
                  'Jayden', 'Noah', 'Anthony', 'Jonathan', 'David', 'John', 'Mark', 'Calvin',
@@ -21,7 +21,7 @@ class FirstNames(object):
     """ can iterate over names for the given gender.
     """
     def __init__(self, gender=None, male_names=ENGLISH_MALE_NAMES,
-                 female_names=ENGLISH_FEMALE_NAMES, *args, **kwargs):
+                 female_names=ENGLISH_FEMALE_NAMES, rng=random, *args, **kwargs):
         self.gender = gender
         if gender in ['male', 'm']:
             self.first_names = male_names
@@ -29,7 +29,7 @@ class FirstNames(object):
             self.first_names = female_names
         else:
             self.first_names = male_names + female_names
-            random.shuffle(self.first_names)
+            rng.shuffle(self.first_names)
         self.index = 0
         self.length = len(self.first_names)
 
@@ -82,10 +82,7 @@ class LastNames(object):
 class Companies(object):
 
     def __init__(self):
-        path = os.path.dirname(os.path.realpath(__file__))
-        self.companies = []
-        with codecs.open(os.path.join(path, 'companies.txt'), encoding='utf-8', mode='rb') as txtfile:
-            self.companies = [line.rstrip() for line in txtfile]
+        self.companies = datasets.companies()
 
     def __call__(self):
         return self.companies
@@ -0,0 +1,133 @@
+""" A text split into paragraphs and sentences, so that text of a given length
+    can be put together without building more than that.
+
+    The paragraphs are joined once with blank lines between them. The table
+    keeps the offset in that text where every sentence starts, and how many
+    words come before it. A prefix of a given number of characters or words is
+    then found with a binary search and sliced out.
+"""
+import re
+from bisect import bisect_left
+
+# Whitespace after the end of a sentence, the end may be followed by quotes or brackets.
+SENTENCE_END = re.compile(r'(?<=[.?!])([\'")\]]*)\s+')
+WORD = re.compile(r'\S+')
+PARAGRAPH_SEPARATOR = u'\n\n'
+
+
+class SentenceTable(object):
+
+    # text tuple => SentenceTable, every text is only split once.
+    tables = {}
+
+    @classmethod
+    def for_text(cls, paragraphs):
+        key = tuple(paragraphs)
+        if key not in cls.tables:
+            cls.tables[key] = cls(key)
+        return cls.tables[key]
+
+    def __init__(self, paragraphs):
+        paragraphs = [p if isinstance(p, unicode) else p.decode('utf-8') for p in paragraphs]
+        self.text = PARAGRAPH_SEPARATOR.join(paragraphs)
+        # Per sentence: where it starts and ends in text and the words before it.
+        self.starts = []
+        self.ends = []
+        self.words_before = []
+        # Per paragraph: the index of its first sentence, plus the number of sentences.
+        self.first_sentences = []
+        # Per paragraph: where it starts in text, plus where one after the last would start.
+        self.paragraph_starts = []
+        offset = words = 0
+        for paragraph in paragraphs:
+            self.first_sentences.append(len(self.starts))
+            self.paragraph_starts.append(offset)
+            start = 0
+            for match in SENTENCE_END.finditer(paragraph):
+                words = self.add_sentence(offset, paragraph, start, match.end(1), words)
+                start = match.end()
+            if start < len(paragraph) or start == 0:
+                words = self.add_sentence(offset, paragraph, start, len(paragraph), words)
+            offset += len(paragraph) + len(PARAGRAPH_SEPARATOR)
+        self.first_sentences.append(len(self.starts))
+        self.paragraph_starts.append(offset)
+        self.words_before.append(words)
+
+    def add_sentence(self, offset, paragraph, start, end, words):
+        self.starts.append(offset + start)
+        self.ends.append(offset + end)
+        self.words_before.append(words)
+        return words + len(WORD.findall(paragraph, start, end))
+
+    def __len__(self):
+        return len(self.first_sentences) - 1
+
+    def sentence(self, index):
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def sentences(self, paragraph):
+        """ The indexes of the sentences of paragraph. """
+        return xrange(self.first_sentences[paragraph], self.first_sentences[paragraph + 1])
+
+    def paragraphs(self, first, count, max_length=None, max_words=None):
+        """ count paragraphs of the text starting with paragraph first, cut
+            after max_length characters and max_words words.
+        """
+        start = self.paragraph_starts[first]
+        end = self.paragraph_starts[first + count] - len(PARAGRAPH_SEPARATOR)
+        if max_words is not None:
+            end = min(end, self.end_of_word(self.words_before[self.first_sentences[first]] + max_words))
+        if max_length is not None:
+            end = min(end, start + max_length)
+        return self.text[start:max(start, end)]
+
+    def end_of_word(self, word):
+        """ The offset in text after the word with index word - 1. """
+        sentence = bisect_left(self.words_before, word) - 1
+        if sentence < 0:
+            return 0
+        if sentence >= len(self.starts):
+            return len(self.text)
+        needed = word - self.words_before[sentence]
+        for i, match in enumerate(WORD.finditer(self.text, self.starts[sentence], self.ends[sentence])):
+            if i + 1 == needed:
+                return match.end()
+        return self.ends[sentence]
+
+    def join(self, paragraphs, max_length=None, max_words=None):
+        """ Joins paragraphs, an iterable of iterables of sentence indexes, the
+            sentences of a paragraph with a space between them. Stops after
+            max_length characters and max_words words, so the iterables are
+            only consumed as far as needed.
+        """
+        if max_words == 0 or max_length == 0:
+            return u''
+        if max_words is None and max_length is None:
+            text, starts, ends = self.text, self.starts, self.ends
+            return PARAGRAPH_SEPARATOR.join(
+                u' '.join([text[starts[index]:ends[index]] for index in paragraph])
+                for paragraph in paragraphs)
+        parts = []
+        length = words = 0
+        for paragraph in paragraphs:
+            separator = PARAGRAPH_SEPARATOR if parts else u''
+            for index in paragraph:
+                start, end = self.starts[index], self.ends[index]
+                words += self.words_before[index + 1] - self.words_before[index]
+                if max_words is not None and words >= max_words:
+                    end = self.end_of_word(self.words_before[index + 1] - (words - max_words))
+                parts.append(separator)
+                parts.append(self.text[start:end])
+                length += len(separator) + end - start
+                separator = u' '
+                if max_words is not None and words >= max_words:
+                    break
+                if max_length is not None and length >= max_length:
+                    break
+            else:
+                continue
+            break
+        text = u''.join(parts)
+        if max_length is not None:
+            return text[:max_length]
+        return text
@@ -1,17 +1,11 @@
-import csv
-import os
+from scaffolding.library import datasets
 
 
 class TopUrl(object):
     """ Returns an URL  """
 
     def __init__(self, prefix=""):
-        path = os.path.dirname(os.path.realpath(__file__))
-        self.urls = []
-        with open(os.path.join(path, 'top-10kURL.csv'), 'rb') as csvfile:
-            reader = csv.reader(csvfile, delimiter=',', quotechar='"')
-            for row in reader:
-                self.urls.append(u'%s%s' %(prefix, unicode(row[0], 'utf-8')))
+        self.urls = datasets.top_urls(prefix)
 
     def __call__(self):
         return self.urls
\ No newline at end of file
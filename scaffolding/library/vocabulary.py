@@ -0,0 +1,73 @@
+""" Compiled vocabularies: a list of strings in one binary file that is read
+    through mmap. The values are only decoded when they are used, so processes
+    don't keep their own copy of the list and all of them share the pages of
+    the file in the page cache.
+
+    The file starts with MAGIC and the number of values n, followed by n + 1
+    offsets into the blob of the UTF-8 encoded values that comes last. Value i
+    is the part of the blob between offset i and offset i + 1. The numbers are
+    unsigned 64 bit integers, little endian.
+"""
+import mmap
+import operator
+import os
+import struct
+
+MAGIC = 'SCVOCAB1'
+HEADER = struct.Struct('<8sQ')
+OFFSET = struct.Struct('<Q')
+OFFSETS = struct.Struct('<QQ')
+
+
+def compile_vocabulary(values, path):
+    """ Writes values, an iterable of unicode strings, to path. """
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    # Replace the file in one step, processes that read it never see half of it.
+    temp_path = '%s.%s.tmp' % (path, os.getpid())
+    with open(temp_path, 'wb') as vocabulary_file:
+        vocabulary_file.write(HEADER.pack(MAGIC, len(encoded)))
+        vocabulary_file.write(struct.pack('<%sQ' % len(offsets), *offsets))
+        vocabulary_file.write(''.join(encoded))
+    os.rename(temp_path, path)
+
+
+class Vocabulary(object):
+    """ The values of a compiled vocabulary as a read-only sequence. prefix is
+        put in front of every value.
+    """
+
+    def __init__(self, path, prefix=u''):
+        self.path = path
+        self.prefix = prefix
+        with open(path, 'rb') as vocabulary_file:
+            # The map stays valid after the file is closed.
+            self.map = mmap.mmap(vocabulary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError('%s is not a compiled vocabulary.' % path)
+        magic, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError('%s is not a compiled vocabulary.' % path)
+        self.blob = HEADER.size + (self.count + 1) * OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index.__class__ is not int:
+            if isinstance(index, slice):
+                return [self[i] for i in xrange(*index.indices(self.count))]
+            # numpy integers work as well.
+            index = operator.index(index)
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('vocabulary index out of range')
+        start, end = OFFSETS.unpack_from(self.map, HEADER.size + index * OFFSET.size)
+        return self.prefix + self.map[self.blob + start:self.blob + end].decode('utf-8')
+
+    def __iter__(self):
+        for index in xrange(self.count):
+            yield self[index]
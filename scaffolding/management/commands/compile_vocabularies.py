@@ -0,0 +1,13 @@
+# coding=utf-8
+
+from django.core.management.base import BaseCommand
+
+from scaffolding.library import datasets
+
+
+class Command(BaseCommand):
+    help = 'Compiles the vocabularies of the library, so the tubes map them instead of parsing them.'
+
+    def handle(self, *args, **options):
+        for name in datasets.VOCABULARIES:
+            print u'Compiled %s' % datasets.build_vocabulary(name, force=True)
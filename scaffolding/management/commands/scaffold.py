@@ -1,34 +1,182 @@
 # coding=utf-8
 
+import multiprocessing
+import os
+import random
+import sys
+import time
 from collections import OrderedDict
+from optparse import make_option
 
 from django.core.management.base import BaseCommand, CommandError
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import Max
 from django.db.models import loading
 
 import scaffolding
+from scaffolding import export
+from scaffolding.checkpoint import Checkpoint
+from scaffolding.profiling import ProfiledTube, Profiler
+from scaffolding.progress import Progress, WorkerProgress, queries
+from scaffolding.raw import RowBuilder, check_raw_model, save_problems, write_rows
+from scaffolding.tubes import derive_seed
 
 
 import logging
 logger = logging.getLogger(__name__)
 
+EXPORT_BATCH_SIZE = 1000
+RAW_BATCH_SIZE = 1000
+
+# Seeded tubes restart their random generators every SEED_BLOCK_SIZE rows.
+SEED_BLOCK_SIZE = 1000
+
 
 class Command(BaseCommand):
-    args = '<app_label.model_name> <count>'
+    args = '<app_label[.model_name]> <count>'
     help = 'Creates placeholder data for your models.'
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size', action='store', type='int', dest='batch_size', default=None,
+                    help='Insert the objects with bulk_create in batches of this size.'),
+        make_option('--workers', action='store', type='int', dest='workers', default=1,
+                    help='Number of processes that create the objects in parallel.'),
+        make_option('--scale', action='store', type='float', dest='scale', default=None,
+                    help='Instead of a count: create scale * scale_factor objects of each model.'),
+        make_option('--output', action='store', dest='output', default=None,
+                    help='Write the objects to a .json, .jsonl or .csv file instead of the database.'),
+        make_option('--seed', action='store', type='int', dest='seed', default=None,
+                    help='Seed for the tubes, the same seed creates the same values.'),
+        make_option('--commit-every', action='store', type='int', dest='commit_every', default=None,
+                    help='Create the objects in transactions of this many objects.'),
+        make_option('--raw', action='store_true', dest='raw', default=False,
+                    help='Insert the values without creating model instances.'),
+        make_option('--profile', action='store_true', dest='profile', default=False,
+                    help='Print the time spent per model, field and phase.'),
+        make_option('--profile-json', action='store', dest='profile_json', default=None,
+                    help='Write the --profile report to this JSON file as well.'),
+        make_option('--stats-file', action='store', dest='stats_file', default=None,
+                    help='Write the rows, rates, queries and times of the run to this JSON file.'),
+        make_option('--checkpoint', action='store', dest='checkpoint', default=None,
+                    help='Record the progress of the run in this file.'),
+        make_option('--resume', action='store_true', dest='resume', default=False,
+                    help='Continue the run recorded in the --checkpoint file.'),
+    )
 
     def handle(self, *args, **options):
 
-        if not args or len(args) != 2:
+        scale = options.get('scale')
+        if scale is None and (not args or len(args) != 2):
             raise CommandError('Do: scaffold <app_label.model_name> <count>')
+        if scale is not None and (not args or len(args) != 1):
+            raise CommandError('Do: scaffold <app_label[.model_name]> --scale <scale>')
+        if scale is not None and scale <= 0:
+            raise CommandError('--scale must be a positive number.')
 
         app_label, separator, model_name = args[0].partition('.')
-        count = int(args[1])
-
-        do_scaffold(app_label, model_name, count)
-
+        count = int(args[1]) if scale is None else None
+
+        batch_size = options.get('batch_size')
+        if batch_size is not None and batch_size < 1:
+            raise CommandError('--batch-size must be a positive number.')
+
+        workers = options.get('workers') or 1
+        if workers < 1:
+            raise CommandError('--workers must be a positive number.')
+
+        output = options.get('output')
+        if output and workers > 1:
+            raise CommandError('--output can\'t be combined with --workers.')
+
+        commit_every = options.get('commit_every')
+        if commit_every is not None and commit_every < 1:
+            raise CommandError('--commit-every must be a positive number.')
+        if commit_every and output:
+            raise CommandError('--commit-every can\'t be combined with --output.')
+
+        raw = options.get('raw')
+        if raw and (output or commit_every):
+            raise CommandError('--raw can\'t be combined with --output or --commit-every.')
+
+        seed = options.get('seed')
+        checkpoint = None
+        checkpoint_path = options.get('checkpoint')
+        if options.get('resume') and not checkpoint_path:
+            raise CommandError('--resume needs the --checkpoint file of the run.')
+        if checkpoint_path:
+            if workers > 1 or output:
+                raise CommandError('--checkpoint can\'t be combined with --workers or --output.')
+            run_args = [args[0], count, scale]
+            if options.get('resume'):
+                if not os.path.exists(checkpoint_path):
+                    raise CommandError('There is no checkpoint %s.' % checkpoint_path)
+                checkpoint = Checkpoint.load(checkpoint_path)
+                if checkpoint.state['args'] != run_args:
+                    raise CommandError('%s is the checkpoint of a different run: %s' % (
+                        checkpoint_path, ' '.join(unicode(arg) for arg in checkpoint.state['args'])))
+                if checkpoint.state['block_size'] != SEED_BLOCK_SIZE:
+                    raise CommandError('%s was written by a different version.' % checkpoint_path)
+                if seed is not None and seed != checkpoint.seed:
+                    raise CommandError('%s was run with --seed %s.' % (checkpoint_path, checkpoint.seed))
+                seed = checkpoint.seed
+            else:
+                if os.path.exists(checkpoint_path):
+                    raise CommandError('%s already exists, use --resume to continue the run.' % checkpoint_path)
+                # A resumed run has to create the same values, so every checkpointed run is seeded.
+                if seed is None:
+                    seed = random.randint(0, 2 ** 31 - 1)
+                checkpoint = Checkpoint.create(checkpoint_path, run_args, seed, SEED_BLOCK_SIZE)
+                checkpoint.save()
+
+        profiler = None
+        if options.get('profile') or options.get('profile_json'):
+            profiler = Profiler()
+
+        # The progress goes to stderr, -v 0 only keeps the stats.
+        progress = Progress(sys.stderr if int(options.get('verbosity', 1)) > 0 else None)
+
+        do_scaffold(app_label, model_name, count, batch_size=batch_size, workers=workers,
+                    scale=scale, output=output, seed=seed, checkpoint=checkpoint,
+                    commit_every=commit_every, raw=raw, profiler=profiler, progress=progress)
+
+        if profiler:
+            print profiler.table()
+            if options.get('profile_json'):
+                profiler.write_json(options['profile_json'])
+                progress.message(u'Wrote %s' % options['profile_json'])
+
+        if options.get('stats_file'):
+            progress.write_json(options['stats_file'], args=list(args), scale=scale,
+                                batch_size=batch_size, workers=workers, seed=seed,
+                                commit_every=commit_every, raw=raw, output=output)
+            progress.message(u'Wrote %s' % options['stats_file'])
+
+
+def do_scaffold(app_label, model_name, count, batch_size=None, workers=1, scale=None,
+                output=None, seed=None, checkpoint=None, commit_every=None, raw=False,
+                profiler=None, progress=None):
+    """ Creates count objects of the model, or of every model of the app with a
+        registered scaffold.
+        If scale is given, the count of every model is scale multiplied with the
+        scale_factor of its scaffold (1 by default).
+        If output is given, the objects are written to that file instead of the
+        database. The initialize_all, finalize and finalize_all hooks are not called then.
+        If seed is given, every tube gets its own random generator derived from the
+        seed, the model and the field name. The same seed creates the same values,
+        with or without batches and workers. The tubes start from their first
+        value and go back to the random module when the run is done.
+        If checkpoint is given, the progress is recorded in it after every batch
+        and a resumed run continues with the first row that isn't in the database.
+        If commit_every is given, the objects are created in transactions of that
+        many objects, see create_objects.
+        If raw is set, the values are inserted without creating model instances,
+        see scaffolding.raw. Models where that would skip anything are refused.
+        If profiler is given, the tubes, hooks and saves are timed with it.
+        The progress is reported to progress, which collects the stats of every
+        model. Without it nothing is reported.
+    """
 
-def do_scaffold(app_label, model_name, count):
+    if progress is None:
+        progress = Progress()
 
     if model_name:
         # We've specified a single model
@@ -48,31 +196,446 @@ def do_scaffold(app_label, model_name, count):
         for key, value in scaffolds.items():
             if key in app_models:
                 models_list.append(key)
-
-
+        # Parents have to exist before the models that link to them.
+        models_list = sort_by_dependencies(models_list)
+
+    writer = None
+    if output:
+        try:
+            export.check_models(output, models_list)
+            writer = export.get_writer(output)
+        except ValueError as e:
+            raise CommandError(e)
+
+    if raw:
+        # Refuse before anything is created.
+        for model in models_list:
+            scaffold = scaffolding.scaffold_for_model(model)
+            try:
+                check_raw_model(model, make_factory(model, 0, set_up=False),
+                                getattr(scaffold, 'finalize_all_chunk_size', None))
+            except ValueError as e:
+                raise CommandError(e)
+
+    # The factories of seeded runs, whose tubes go back to the random module afterwards.
+    seeded_factories = []
+    try:
+        for model in models_list:
+
+            if scale is not None:
+                scale_factor = getattr(scaffolding.scaffold_for_model(model), 'scale_factor', 1)
+                count = max(int(round(scale * scale_factor)), 1)
+
+            if writer:
+                progress.start(model, count)
+                factory = make_factory(model, count, seed=seed, profiler=profiler)
+                if seed is not None:
+                    seeded_factories.append(factory)
+                export_objects(model, factory, count, batch_size or EXPORT_BATCH_SIZE, writer,
+                               seeded=seed is not None, progress=progress)
+                progress.finish()
+                continue
+
+            if checkpoint and checkpoint.is_done(model):
+                progress.message(u'Skipping %s, they have already been created' % model._meta.verbose_name_plural)
+                continue
+
+            # A resumed model continues with the first row that hasn't been committed.
+            resumed = checkpoint is not None and checkpoint.model_state(model) is not None
+            first_row = checkpoint.next_row(model) if resumed else 0
+
+            progress.start(model, count - first_row)
+
+            # The workers set up their own tubes for their share of the objects.
+            factory = make_factory(model, count, set_up=workers == 1,
+                                   seed=seed if workers == 1 else None, profiler=profiler)
+            if seed is not None and workers == 1:
+                seeded_factories.append(factory)
+
+            if factory.get('_initialize_all', False) and not resumed:
+                factory['_initialize_all'](model)
+
+            # finalize_all gets a list of all objects, unless the scaffold sets
+            # finalize_all_chunk_size. Then it gets an iterator that fetches the new
+            # objects from the database in chunks of that size.
+            chunk_size = getattr(scaffolding.scaffold_for_model(model), 'finalize_all_chunk_size', None)
+            keep_objects = '_finalize_all' in factory and not chunk_size
+            last_pk = None
+            if '_finalize_all' in factory and chunk_size:
+                if not has_auto_pk(model):
+                    raise CommandError('finalize_all_chunk_size needs an auto-incremented primary key.')
+                if resumed:
+                    last_pk = checkpoint.model_state(model)['last_pk']
+                else:
+                    last_pk = model._default_manager.aggregate(last_pk=Max('pk'))['last_pk']
+
+            if checkpoint and not resumed:
+                checkpoint.start(model, count, last_pk)
+
+            if workers > 1:
+                new_objects = create_objects_in_workers(model, count, batch_size, workers,
+                                                        keep_objects=keep_objects, seed=seed,
+                                                        commit_every=commit_every, raw=raw,
+                                                        profiler=profiler, progress=progress)
+            elif raw:
+                new_objects = load_rows(model, factory, count - first_row, batch_size or RAW_BATCH_SIZE,
+                                        seeded=seed is not None, first_row=first_row,
+                                        checkpoint=checkpoint, progress=progress)
+            else:
+                new_objects = create_objects(model, factory, count - first_row, batch_size,
+                                             keep_objects=keep_objects, seeded=seed is not None,
+                                             first_row=first_row, checkpoint=checkpoint,
+                                             commit_every=commit_every, progress=progress)
+
+            for field_name, generator, setter in factory['_plan']:
+                if workers == 1 and hasattr(generator, 'report'):
+                    progress.message(u'%s: %s' % (field_name, generator.report()))
+
+            if factory.get('_finalize_all', False):
+                if chunk_size:
+                    new_objects = iter_new_objects(model, last_pk, chunk_size)
+                factory['_finalize_all'](model, new_objects)
+
+            if checkpoint:
+                checkpoint.finish(model)
+
+            progress.finish()
+    finally:
+        for factory in seeded_factories:
+            unseed_tubes(factory)
+        if writer:
+            writer.close()
+
+    if writer:
+        progress.message(u'Wrote %s' % output)
+
+def sort_by_dependencies(models_list):
+    """ Sorts the models so that the targets of ForeignKey and OneToOne fields come
+        before the models pointing to them. Models in a dependency cycle keep the
+        order of models_list.
+    """
+    dependencies = OrderedDict()
     for model in models_list:
-
-        print u'Creating %s\n' % model
-
-        factory = make_factory(model, count)
-
-        if factory.get('_initialize_all', False):
-            factory['_initialize_all'](model)
-
-        new_objects = []
-
-        for i in range(count):
+        dependencies[model] = set(
+            field.rel.to for field in model._meta.fields
+            if field.rel and field.rel.to in models_list and field.rel.to is not model)
+
+    sorted_models = []
+    while dependencies:
+        ready = [model for model, parents in dependencies.items()
+                 if not parents.difference(sorted_models)]
+        if not ready:
+            # A cycle, continue with the first remaining model.
+            ready = [next(iter(dependencies))]
+        for model in ready:
+            sorted_models.append(model)
+            del dependencies[model]
+
+    return sorted_models
+
+def create_objects(model, factory, count, batch_size=None, keep_objects=True, seeded=False,
+                   first_row=0, checkpoint=None, commit_every=None, progress=None):
+    """ Creates count objects. Returns them if keep_objects is set, otherwise an
+        empty list so the objects don't stay in memory.
+        seeded tubes start at first_row, see row_chunks.
+        With commit_every the objects are created in transactions of that many
+        objects, hooks included. A transaction that fails is rolled back and
+        reported, and the run continues with the next one.
+    """
+    if commit_every:
+        return create_objects_in_transactions(model, factory, count, batch_size, keep_objects,
+                                              seeded, first_row, checkpoint, commit_every, progress)
+
+    new_objects = []
+
+    if batch_size and can_bulk_create(model, progress):
+        created = 0
+        for size in row_chunks(factory, count, batch_size, seeded, first_row):
+            batch = build_objects(model, factory, size)
+            save_batch(model, factory, batch)
+            if keep_objects:
+                new_objects.extend(batch)
+            created += size
+            if checkpoint:
+                checkpoint.update(model, first_row + created)
+            if progress:
+                progress.update(created)
+    else:
+        for i, size in enumerate(row_chunks(factory, count, 1, seeded, first_row)):
             if i%100==0 and i>0:
-                print u'Created %s\n' % i
-            new_objects.append(make_object(model, factory))
-
-        if factory.get('_finalize_all', False):
-            factory['_finalize_all'](model, new_objects)
-
-        print u'\nCreated %s %s\n' % (count, model._meta.verbose_name_plural)
-
-def make_factory(cls, count):
+                if checkpoint:
+                    checkpoint.update(model, first_row + i)
+                if progress:
+                    progress.update(i)
+            obj = make_object(model, factory)
+            if keep_objects:
+                new_objects.append(obj)
+        if progress:
+            progress.update(count)
+
+    return new_objects
+
+def load_rows(model, factory, count, batch_size, seeded=False, first_row=0, checkpoint=None,
+              progress=None):
+    """ Inserts count rows with the values of the tubes, without creating
+        model instances. Every batch is inserted in its own transaction.
+        Returns an empty list, there are no objects to keep.
+    """
+    connection = connections[router.db_for_write(model)]
+    builder = RowBuilder(model, factory, connection)
+    created = 0
+    for size in row_chunks(factory, count, batch_size, seeded, first_row):
+        rows = builder.build(size)
+        with transaction.atomic(using=connection.alias):
+            if '_profiler' in factory:
+                factory['_profiler'].call(factory['_save'], write_rows, connection, builder.table,
+                                          builder.columns, rows)
+            else:
+                write_rows(connection, builder.table, builder.columns, rows)
+        created += size
+        if checkpoint:
+            checkpoint.update(model, first_row + created)
+        if progress:
+            progress.update(created)
+    return []
+
+def create_objects_in_transactions(model, factory, count, batch_size, keep_objects, seeded,
+                                   first_row, checkpoint, commit_every, progress=None):
+    bulk = batch_size and can_bulk_create(model, progress)
+    chunks = row_chunks(factory, count, batch_size if bulk else 1, seeded, first_row, commit_every)
+    new_objects = []
+    row = failed = 0
+
+    while row < count:
+        size = min(commit_every, count - row)
+        objects = []
+        pulled = 0
+        try:
+            with transaction.atomic():
+                while pulled < size:
+                    chunk = next(chunks)
+                    pulled += chunk
+                    if bulk:
+                        objects.extend(save_batch(model, factory, build_objects(model, factory, chunk)))
+                    else:
+                        objects.append(make_object(model, factory))
+        except Exception as e:
+            # The tubes skip the remaining rows of the transaction, the rows after
+            # it get the same values as if it hadn't failed.
+            while pulled < size:
+                chunk = next(chunks)
+                pulled += chunk
+                skip_rows(factory, chunk)
+            failed += size
+            if checkpoint:
+                checkpoint.add_failed(model, size)
+            if progress:
+                progress.message(u'Rolled back rows %s to %s: %s' % (
+                    first_row + row + 1, first_row + row + size, e))
+        else:
+            if keep_objects:
+                new_objects.extend(objects)
+        row += size
+        if checkpoint:
+            checkpoint.update(model, first_row + row)
+        if progress:
+            progress.update(row - failed, failed)
+
+    return new_objects
+
+def row_chunks(factory, count, size, seeded=False, first_row=0, commit_every=None):
+    """ Yields the sizes of the chunks of up to size rows in which count rows are
+        generated.
+        With seeded tubes the rows are counted from first_row: the tubes are moved
+        to first_row first and restarted at the beginning of every block, and
+        no chunk crosses the border of a block.
+        No chunk crosses the border of a transaction of commit_every rows either.
+        Without a seed only the disjoint tubes are moved to first_row.
+    """
+    if seeded:
+        position_tubes(factory, first_row)
+    elif first_row:
+        for field_name, generator, setter in factory['_plan']:
+            if getattr(generator, 'disjoint', False):
+                generator.skip(first_row)
+    row, end = first_row, first_row + count
+    while row < end:
+        chunk = min(size, end - row)
+        if commit_every:
+            chunk = min(chunk, commit_every - (row - first_row) % commit_every)
+        if seeded:
+            offset = row % SEED_BLOCK_SIZE
+            if offset == 0 and row != first_row:
+                seed_block(factory, row // SEED_BLOCK_SIZE)
+            chunk = min(chunk, SEED_BLOCK_SIZE - offset)
+        yield chunk
+        row += chunk
+
+def seed_block(factory, block):
+    for field_name, generator, setter in factory['_plan']:
+        if hasattr(generator, 'seed_block'):
+            generator.seed_block(block)
+
+def unseed_tubes(factory):
+    for field_name, generator, setter in factory['_plan']:
+        if hasattr(generator, 'unseed'):
+            generator.unseed()
+
+def skip_rows(factory, count):
+    for field_name, generator, setter in factory['_plan']:
+        if hasattr(generator, 'skip'):
+            generator.skip(count)
+        else:
+            for i in xrange(count):
+                generator.next()
+
+def position_tubes(factory, row):
+    """ Moves seeded tubes to row as if all the rows before had been generated.
+        Tubes without any state besides their random generator only have to
+        replay the rows of the current block.
+    """
+    block, offset = divmod(row, SEED_BLOCK_SIZE)
+    for field_name, generator, setter in factory['_plan']:
+        if not hasattr(generator, 'seed_block'):
+            continue
+        if not getattr(generator, 'stateless', False):
+            # The blocks before are replayed with their own seeds, the state of
+            # tubes like OrNone depends on the values they generated.
+            for previous in xrange(block):
+                generator.seed_block(previous)
+                generator.skip(SEED_BLOCK_SIZE)
+        generator.seed_block(block)
+        generator.skip(offset)
+
+def has_auto_pk(model):
+    pk = model._meta.pk
+    # Children of multi-table inheritance use the primary key of their parent.
+    while pk.rel and pk.rel.parent_link:
+        pk = pk.rel.to._meta.pk
+    return isinstance(pk, models.AutoField)
+
+def iter_new_objects(model, last_pk, chunk_size):
+    """ Yields the objects with a primary key greater than last_pk. They are
+        fetched in chunks, so only chunk_size objects are in memory at a time.
+    """
+    queryset = model._default_manager.order_by('pk')
+    while True:
+        if last_pk is not None:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        else:
+            chunk = list(queryset[:chunk_size])
+        if not chunk:
+            return
+        for obj in chunk:
+            yield obj
+        last_pk = chunk[-1].pk
+
+def export_objects(model, factory, count, batch_size, writer, seeded=False, progress=None):
+    """ Builds the objects batch by batch and passes them to the writer without
+        saving them, so only one batch is in memory at a time.
+    """
+    written = 0
+    for size in row_chunks(factory, count, batch_size, seeded):
+        writer.write(build_objects(model, factory, size))
+        written += size
+        if progress:
+            progress.update(written)
+
+def create_objects_in_workers(model, count, batch_size, workers, keep_objects=False, seed=None,
+                              commit_every=None, raw=False, profiler=None, progress=None):
+    """ Splits count between a pool of worker processes. Returns the combined
+        objects if keep_objects is set, otherwise an empty list.
+        With a seed every worker generates the same rows as a single process would.
+        The workers add their rows to counters shared with this process, which
+        reports their sum to progress.
+    """
+    shares = [count // workers + (1 if i < count % workers else 0) for i in range(workers)]
+    tasks = []
+    first_row = 0
+    for share in shares:
+        if share:
+            tasks.append((model, share, batch_size, keep_objects, seed, first_row, commit_every, raw,
+                          profiler is not None))
+        first_row += share
+    if not tasks:
+        return []
+
+    rows = multiprocessing.Value('l', 0)
+    failed = multiprocessing.Value('l', 0)
+    verbose = progress is not None and progress.stream is not None
+
+    # Forked processes must not share the database connections of the parent.
+    connections.close_all()
+    pool = multiprocessing.Pool(len(tasks), initializer=_init_worker,
+                                initargs=(rows, failed, verbose))
+    try:
+        pending = pool.map_async(_scaffold_worker, tasks)
+        while not pending.ready():
+            pending.wait(Progress.interval)
+            if progress:
+                progress.update(rows.value, failed.value)
+        results = pending.get()
+    finally:
+        pool.close()
+        pool.join()
+
+    new_objects = []
+    for i, result in enumerate(results):
+        new_objects.extend(result['objects'])
+        if profiler:
+            profiler.merge(result['timings'])
+        if progress:
+            progress.add_queries(result['queries'])
+            progress.message(u'Worker %s created %s objects in %.2fs' % (
+                i + 1, result['count'], result['seconds']))
+
+    return new_objects
+
+# The WorkerProgress of a worker process, set by _init_worker.
+_worker_progress = None
+
+def _init_worker(rows, failed, verbose):
+    global _worker_progress
+    _worker_progress = WorkerProgress(rows, failed, sys.stderr if verbose else None)
+    connections.close_all()
+    # Otherwise every worker would generate the same random values.
+    random.seed()
+    try:
+        import numpy
+        numpy.random.seed()
+    except ImportError:
+        pass
+
+def _scaffold_worker(task):
+    model, count, batch_size, keep_objects, seed, first_row, commit_every, raw, profile = task
+    start = time.time()
+    queries.install()
+    start_queries = queries.count
+    profiler = Profiler() if profile else None
+    factory = make_factory(model, count, seed=seed, profiler=profiler)
+    if raw:
+        new_objects = load_rows(model, factory, count, batch_size or RAW_BATCH_SIZE,
+                                seeded=seed is not None, first_row=first_row,
+                                progress=_worker_progress)
+    else:
+        new_objects = create_objects(model, factory, count, batch_size, keep_objects=keep_objects,
+                                     seeded=seed is not None, first_row=first_row,
+                                     commit_every=commit_every, progress=_worker_progress)
+    connections.close_all()
+    return {
+        'count': count,
+        'seconds': time.time() - start,
+        'queries': queries.count - start_queries,
+        'objects': new_objects,
+        'timings': profiler.timings if profiler else None,
+    }
+
+def make_factory(cls, count, set_up=True, seed=None, profiler=None):
     """ Get the generators from the Scaffolding class within the model.
+        With set_up=False the set_up hooks of the tubes are not called.
+        If seed is given, the tubes are seeded with a seed derived from it.
+        If profiler is given, the tubes, setters and hooks are wrapped to be
+        timed, and the saves are timed too.
     """
     factory = OrderedDict()
     text = []
@@ -85,11 +648,21 @@ def make_factory(cls, count):
     for field_name in field_names:
         generator = getattr(scaffold, field_name, None)
         if generator:
-            if hasattr(generator, 'set_up'):
-                generator.set_up(cls, count)
+            if set_up and hasattr(generator, 'set_up'):
+                if profiler:
+                    profiler.call(profiler.timing(cls, field_name, 'set_up'), generator.set_up,
+                                  cls, count, field_name=field_name)
+                else:
+                    generator.set_up(cls, count, field_name=field_name)
+            if seed is not None and hasattr(generator, 'seed'):
+                generator.seed(derive_seed(seed, cls._meta.app_label, cls._meta.object_name,
+                                           field_name))
             factory[field_name] = generator
             text.append(u'%s: %s; ' % (field_name, factory[field_name]))
 
+    # The hooks are added after the plan, it only contains the tubes.
+    factory['_plan'] = compile_plan(cls, factory)
+
     if hasattr(scaffold, 'initialize_all') and hasattr(scaffold.initialize_all, '__call__'):
         factory['_initialize_all'] = scaffold.initialize_all
 
@@ -99,43 +672,135 @@ def make_factory(cls, count):
     if hasattr(scaffold, 'finalize') and hasattr(scaffold.finalize, '__call__'):
         factory['_finalize'] = scaffold.finalize
 
+    if hasattr(scaffold, 'finalize_batch') and hasattr(scaffold.finalize_batch, '__call__'):
+        factory['_finalize_batch'] = scaffold.finalize_batch
+
     if hasattr(scaffold, 'finalize_all') and hasattr(scaffold.finalize_all, '__call__'):
         factory['_finalize_all'] = scaffold.finalize_all
 
+    if profiler:
+        factory['_plan'] = [(field_name, ProfiledTube(generator, profiler.timing(cls, field_name, 'next')),
+                             profiler.wrap(cls, field_name, 'assign', setter))
+                            for field_name, generator, setter in factory['_plan']]
+        for hook in ['_initialize_all', '_initialize', '_finalize', '_finalize_batch', '_finalize_all']:
+            if hook in factory:
+                factory[hook] = profiler.wrap(cls, '', hook[1:], factory[hook])
+        factory['_save'] = profiler.timing(cls, '', 'save')
+        factory['_profiler'] = profiler
+
     return factory
 
+def compile_plan(cls, factory):
+    """ Resolves the fields of the tubes once per model. Returns a list of
+        (field_name, tube, setter) tuples, setter(obj, value) assigns a value of
+        the tube to an object.
+    """
+    return [(field_name, generator, make_setter(cls._meta.get_field(field_name), field_name, generator))
+            for field_name, generator in factory.items()]
+
+def make_setter(field, field_name, generator):
+    if isinstance(generator, scaffolding.OtherField):
+        # The value is a (source_field, function) tuple, the function gets the
+        # value of the source field.
+        def set_other_field(obj, value):
+            setattr(obj, field_name, value[1](getattr(obj, value[0])))
+        return set_other_field
+
+    if isinstance(field, models.fields.related.ForeignKey):
+        attname = field.attname
+        # A tube can yield objects or primary keys.
+        def set_foreign_key(obj, value):
+            if isinstance(value, (int, long)):
+                setattr(obj, attname, value)
+            else:
+                setattr(obj, field_name, value)
+        return set_foreign_key
+
+    if isinstance(field, models.fields.files.FileField):
+        def set_file(obj, value):
+            getattr(obj, field_name).save(*value, save=False)
+        return set_file
+
+    def set_attribute(obj, value):
+        setattr(obj, field_name, value)
+    return set_attribute
+
+def can_bulk_create(cls, progress=None):
+    """ bulk_create can't save models with multi-table inheritance and skips
+        custom save() methods and the save signals, those models are created
+        row by row. The reason is reported to progress.
+    """
+    problems = save_problems(cls)
+    if problems and progress:
+        progress.message(u'Saving %s row by row, %s.' % (cls._meta.verbose_name_plural, ', '.join(problems)))
+    return not problems
+
 def make_object(cls, fields):
+    obj = build_object(cls, fields)
+    if '_profiler' in fields:
+        fields['_profiler'].call(fields['_save'], obj.save)
+    else:
+        obj.save()
+
+    finalize = fields.get('_finalize', None)
+    if finalize:
+        finalize(obj)
+
+    return obj
+
+def save_batch(cls, fields, objects):
+    """ Inserts a list of unsaved objects with a single bulk_create and runs the
+        finalize hooks on them.
+        Note that bulk_create only sets the primary keys of the objects on backends
+        that support it (e.g. PostgreSQL).
+    """
+    if '_profiler' in fields:
+        fields['_profiler'].call(fields['_save'], cls._default_manager.bulk_create, objects)
+    else:
+        cls._default_manager.bulk_create(objects)
+
+    finalize = fields.get('_finalize', None)
+    if finalize:
+        for obj in objects:
+            finalize(obj)
+
+    finalize_batch = fields.get('_finalize_batch', None)
+    if finalize_batch:
+        finalize_batch(cls, objects)
+
+    return objects
+
+def build_object(cls, fields):
+    """ Creates an unsaved instance of cls with the values from the tubes. """
 
     obj = cls()
     initialize = fields.get('_initialize', None)
-    finalize = fields.get('_finalize', None)
 
     if initialize:
         initialize(obj)
 
-    for field_name, generator in fields.items():
-        if not field_name in ['_initialize_all', '_initialize', '_finalize', '_finalize_all']:
-            # Some custom processing
-            field = cls._meta.get_field(field_name)
-            value = generator.next()
-            if isinstance(field, models.fields.related.ForeignKey) and isinstance(value, int):
-                field_name = u'%s_id' % field_name
-            if isinstance(generator, scaffolding.OtherField):
-                # Special handling for OtherField tube
-                source_field = value[0]
-                fn = value[1]
-                calc_value = fn(getattr(obj, source_field))
-                setattr(obj, field_name, calc_value)
-            else:
-                # Normal tube handling
-                if isinstance(field, models.fields.files.FileField):
-                    getattr(obj, field_name).save(*value, save=False)
-                else:
-                    setattr(obj, field_name, value)
+    for field_name, generator, setter in fields['_plan']:
+        setter(obj, generator.next())
 
-    obj.save()
+    return obj
 
-    if finalize:
-        finalize(obj)
+def build_objects(cls, fields, count):
+    """ Creates count unsaved instances of cls. The values are pulled from the
+        tubes a whole column at a time.
+    """
+    objects = [cls() for i in range(count)]
+    initialize = fields.get('_initialize', None)
 
-    return obj
+    if initialize:
+        for obj in objects:
+            initialize(obj)
+
+    for field_name, generator, setter in fields['_plan']:
+        if hasattr(generator, 'next_batch'):
+            values = generator.next_batch(count)
+        else:
+            values = [generator.next() for i in range(count)]
+        for obj, value in zip(objects, values):
+            setter(obj, value)
+
+    return objects
@@ -0,0 +1,154 @@
+""" Timing of scaffold runs, per model and field and per phase.
+
+    A phase is one of: set_up, next (the tube yields a value), assign (the value
+    is set on the object, this includes saving files to the storage), save and
+    the hooks. Only the run with --profile is instrumented, the tubes and hooks
+    of other runs are not wrapped.
+"""
+import json
+import random
+from collections import OrderedDict
+from timeit import default_timer
+
+PHASES = ['set_up', 'initialize_all', 'initialize', 'next', 'assign', 'save', 'finalize',
+          'finalize_batch', 'finalize_all']
+
+
+class Timing(object):
+    """ The number of calls and the total time of one model, field and phase.
+        The percentiles are computed from a sample of at most max_samples calls.
+    """
+    max_samples = 10000
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.samples = []
+        # Its own generator, the random module may be the one of the tubes.
+        self.random = random.Random(0)
+
+    def add(self, seconds, calls=1):
+        """ Records calls calls that took seconds together. """
+        self.calls += calls
+        self.total += seconds
+        sample = seconds / calls
+        if len(self.samples) < self.max_samples:
+            self.samples.append(sample)
+        else:
+            index = self.random.randint(0, self.calls - 1)
+            if index < self.max_samples:
+                self.samples[index] = sample
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.total += other.total
+        self.samples = (self.samples + other.samples)[:self.max_samples]
+
+    def percentile(self, percent):
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100.0))]
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'total': self.total,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class Profiler(object):
+
+    def __init__(self):
+        # (model label, field name or '', phase) => Timing
+        self.timings = OrderedDict()
+
+    def timing(self, model, field_name, phase):
+        key = (u'%s.%s' % (model._meta.app_label, model._meta.object_name), field_name, phase)
+        if key not in self.timings:
+            self.timings[key] = Timing()
+        return self.timings[key]
+
+    def call(self, timing, function, *args, **kwargs):
+        start = default_timer()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timing.add(default_timer() - start)
+
+    def wrap(self, model, field_name, phase, function):
+        """ Returns function, timed as the phase of the field of model. """
+        timing = self.timing(model, field_name, phase)
+        def timed(*args, **kwargs):
+            return self.call(timing, function, *args, **kwargs)
+        return timed
+
+    def merge(self, timings):
+        for key, timing in timings.items():
+            if key in self.timings:
+                self.timings[key].merge(timing)
+            else:
+                self.timings[key] = timing
+
+    def phase_totals(self):
+        totals = OrderedDict((phase, 0.0) for phase in PHASES)
+        for (model, field_name, phase), timing in self.timings.items():
+            totals[phase] = totals.get(phase, 0.0) + timing.total
+        return totals
+
+    def table(self):
+        lines = [u'%-24s %-28s %10s %10s %10s %10s %10s' % (
+            'Model', 'Field / phase', 'Calls', 'Total s', 'p50 us', 'p95 us', 'p99 us')]
+        for (model, field_name, phase), timing in sorted(self.timings.items()):
+            name = u'%s (%s)' % (field_name, phase) if field_name else phase
+            lines.append(u'%-24s %-28s %10d %10.3f %10.1f %10.1f %10.1f' % (
+                model, name, timing.calls, timing.total, timing.percentile(50) * 1e6,
+                timing.percentile(95) * 1e6, timing.percentile(99) * 1e6))
+        lines.append(u'')
+        lines.append(u'Phase totals')
+        for phase, total in self.phase_totals().items():
+            lines.append(u'%-24s %10.3f s' % (phase, total))
+        return u'\n'.join(lines)
+
+    def as_dict(self):
+        models = OrderedDict()
+        for (model, field_name, phase), timing in self.timings.items():
+            models.setdefault(model, []).append(dict(timing.as_dict(), field=field_name, phase=phase))
+        return {'models': models, 'phases': self.phase_totals()}
+
+    def write_json(self, path):
+        with open(path, 'w') as json_file:
+            json.dump(self.as_dict(), json_file, indent=2)
+
+
+class ProfiledTube(object):
+    """ Times the values a tube yields and passes everything else on to it. """
+
+    def __init__(self, tube, timing):
+        self.tube = tube
+        self.timing = timing
+
+    def __getattr__(self, name):
+        return getattr(self.tube, name)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        start = default_timer()
+        value = self.tube.next()
+        self.timing.add(default_timer() - start)
+        return value
+
+    def next_batch(self, n):
+        start = default_timer()
+        if hasattr(self.tube, 'next_batch'):
+            values = self.tube.next_batch(n)
+        else:
+            values = [self.tube.next() for i in xrange(n)]
+        if n:
+            self.timing.add(default_timer() - start, n)
+        return values
@@ -0,0 +1,229 @@
+""" Progress reports and stats of scaffold runs.
+
+    While a model is created, a line with the rows created so far, the rows per
+    second, the estimated time left, the queries sent to the databases and the
+    elapsed time is written at most every Progress.interval seconds. A terminal
+    gets one line that is rewritten, other streams a line per report.
+
+    The rate of the estimate is smoothed over the reports, so a slow batch
+    doesn't throw it off.
+"""
+import datetime
+import json
+import platform
+import time
+from collections import OrderedDict
+
+import django
+from django.db import connections
+
+
+class QueryCounter(object):
+    """ Counts the execute() and executemany() calls of the cursors of all
+        database connections of the process, one call is one round-trip.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def install(self):
+        for connection in connections.all():
+            # Forked processes inherit the installed cursors.
+            if 'make_cursor' in connection.__dict__:
+                continue
+            connection.make_cursor = self.wrap(connection.make_cursor)
+            connection.make_debug_cursor = self.wrap(connection.make_debug_cursor)
+
+    def wrap(self, make_cursor):
+        def make_counted_cursor(cursor):
+            return CountedCursor(make_cursor(cursor), self)
+        return make_counted_cursor
+
+queries = QueryCounter()
+
+
+class CountedCursor(object):
+
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def execute(self, *args, **kwargs):
+        self.counter.count += 1
+        return self.cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self.counter.count += 1
+        return self.cursor.executemany(*args, **kwargs)
+
+
+class Progress(object):
+    """ Reports the progress of a run to stream and collects the stats of every
+        model. Without a stream only the stats are collected.
+    """
+    interval = 1.0
+    # Weight of the latest rate in the smoothed rate.
+    smoothing = 0.3
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.tty = stream is not None and getattr(stream, 'isatty', lambda: False)()
+        self.started = datetime.datetime.utcnow()
+        self.start_time = time.time()
+        self.models = []
+        self.current = None
+        self.line = False
+
+    def message(self, text):
+        if self.stream is None:
+            return
+        self.end_line()
+        self.stream.write(u'%s\n' % text)
+        self.stream.flush()
+
+    def start(self, model, count):
+        """ Starts the report of model, of which count rows are to be created. """
+        queries.install()
+        now = time.time()
+        self.current = OrderedDict([
+            ('model', u'%s.%s' % (model._meta.app_label, model._meta.object_name)),
+            ('count', count),
+            ('rows', 0),
+            ('failed', 0),
+            ('seconds', 0.0),
+            ('rows_per_second', 0.0),
+            ('queries', 0),
+        ])
+        self.models.append(self.current)
+        self.model_start = now
+        self.start_queries = queries.count
+        self.worker_queries = 0
+        self.last_time = self.last_report = now
+        self.last_rows = 0
+        self.rate = None
+        self.reported = None
+
+    def update(self, rows, failed=0):
+        """ Records that rows rows of the current model have been created and
+            failed rows rolled back so far.
+        """
+        self.current['rows'] = rows
+        self.current['failed'] = failed
+        now = time.time()
+        if now - self.last_report >= self.interval:
+            self.measure(now)
+            self.report()
+
+    def add_queries(self, count):
+        """ Adds the queries sent by worker processes to the current model. """
+        self.worker_queries += count
+
+    def finish(self):
+        self.measure(time.time())
+        # Unless the last report already had the final numbers.
+        if self.reported != (self.current['rows'], self.current['failed']):
+            self.report()
+        self.end_line()
+
+    def measure(self, now):
+        stats = self.current
+        done = stats['rows'] + stats['failed']
+        if now > self.last_time:
+            rate = (done - self.last_rows) / (now - self.last_time)
+            if self.rate is None:
+                self.rate = rate
+            else:
+                self.rate = self.smoothing * rate + (1 - self.smoothing) * self.rate
+        self.last_time = self.last_report = now
+        self.last_rows = done
+        stats['seconds'] = now - self.model_start
+        stats['rows_per_second'] = done / stats['seconds'] if stats['seconds'] else 0.0
+        stats['queries'] = queries.count - self.start_queries + self.worker_queries
+
+    def eta(self):
+        stats = self.current
+        left = stats['count'] - stats['rows'] - stats['failed']
+        if left <= 0:
+            return u'0:00:00'
+        if not self.rate:
+            return u'?'
+        return unicode(datetime.timedelta(seconds=int(left / self.rate)))
+
+    def report(self):
+        if self.stream is None:
+            return
+        stats = self.current
+        self.reported = (stats['rows'], stats['failed'])
+        done = stats['rows'] + stats['failed']
+        text = u'%s: %s/%s (%d%%), %.0f rows/s, ETA %s, %s queries, %.1fs' % (
+            stats['model'], stats['rows'], stats['count'],
+            100 * done // stats['count'] if stats['count'] else 100,
+            self.rate or 0.0, self.eta(), stats['queries'], stats['seconds'])
+        if stats['failed']:
+            text += u', %s failed' % stats['failed']
+        if self.tty:
+            self.stream.write(u'\r\033[K%s' % text)
+            self.line = True
+        else:
+            self.stream.write(u'%s\n' % text)
+        self.stream.flush()
+
+    def end_line(self):
+        if self.line:
+            self.stream.write(u'\n')
+            self.line = False
+
+    def as_dict(self, **run):
+        """ The stats of the run, run is stored with them (arguments, options). """
+        return OrderedDict([
+            ('started', self.started.isoformat() + 'Z'),
+            ('seconds', time.time() - self.start_time),
+            ('python', platform.python_version()),
+            ('django', django.get_version()),
+            ('run', run),
+            ('rows', sum(stats['rows'] for stats in self.models)),
+            ('failed', sum(stats['failed'] for stats in self.models)),
+            ('queries', sum(stats['queries'] for stats in self.models)),
+            ('models', self.models),
+        ])
+
+    def write_json(self, path, **run):
+        with open(path, 'w') as json_file:
+            json.dump(self.as_dict(**run), json_file, indent=2)
+
+
+class WorkerProgress(object):
+    """ Passes the progress of a worker process on to the counters it shares
+        with the parent, whose Progress reports the sum. Messages are written to
+        stream right away.
+    """
+
+    def __init__(self, rows, failed, stream=None):
+        self.rows = rows
+        self.failed = failed
+        self.stream = stream
+        self.last_rows = self.last_failed = 0
+
+    def update(self, rows, failed=0):
+        with self.rows.get_lock():
+            self.rows.value += rows - self.last_rows
+        with self.failed.get_lock():
+            self.failed.value += failed - self.last_failed
+        self.last_rows, self.last_failed = rows, failed
+
+    def message(self, text):
+        if self.stream is not None:
+            self.stream.write(u'%s\n' % text)
+            self.stream.flush()
@@ -0,0 +1,142 @@
+""" Loads the values of the tubes straight into the table, without creating
+    model instances. PostgreSQL gets the rows with COPY ... FROM STDIN, other
+    databases with executemany.
+
+    Only models where nothing would be skipped can be loaded like this: no
+    multi-table inheritance, FileFields, custom save() methods, save signals or
+    hooks that need the objects.
+"""
+import datetime
+from cStringIO import StringIO
+
+from django.db import models
+from django.db.models import signals
+
+import scaffolding
+
+
+def check_raw_model(model, factory, finalize_all_chunk_size=None):
+    """ Raises ValueError if model can't be loaded raw. """
+    opts = model._meta
+    problems = save_problems(model)
+    for field in opts.local_concrete_fields:
+        if isinstance(field, models.FileField):
+            problems.append('%s is a FileField' % field.name)
+        elif not has_default_pre_save(field):
+            problems.append('%s has a custom pre_save()' % field.name)
+    for hook in ['_initialize', '_finalize', '_finalize_batch']:
+        if hook in factory:
+            problems.append('the scaffold has a %s hook' % hook[1:])
+    if '_finalize_all' in factory and not finalize_all_chunk_size:
+        problems.append('finalize_all needs finalize_all_chunk_size')
+    local_fields = set(opts.local_concrete_fields)
+    for field_name, generator, setter in factory['_plan']:
+        if isinstance(generator, scaffolding.OtherField):
+            problems.append('%s is an OtherField' % field_name)
+        elif opts.get_field(field_name) not in local_fields and not opts.parents:
+            problems.append('%s is not a column of the table' % field_name)
+    if problems:
+        raise ValueError('%s can\'t be loaded raw: %s.' % (model.__name__, ', '.join(problems)))
+
+
+def save_problems(model):
+    """ Returns what saving the objects of model without their save() method
+        would skip, like bulk_create does.
+    """
+    problems = []
+    if model._meta.parents:
+        problems.append('it uses multi-table inheritance')
+    if model.save.im_func is not models.Model.save.im_func:
+        problems.append('it has a custom save() method')
+    for signal, name in [(signals.pre_save, 'pre_save'), (signals.post_save, 'post_save')]:
+        if signal.has_listeners(model):
+            problems.append('it has %s receivers' % name)
+    return problems
+
+
+def has_default_pre_save(field):
+    # The date and time fields only set the current time in pre_save.
+    if isinstance(field, (models.DateField, models.TimeField)):
+        return True
+    return type(field).pre_save.im_func is models.Field.pre_save.im_func
+
+
+class Holder(object):
+    """ Takes the attribute pre_save sets instead of a model instance. """
+
+
+class RowBuilder(object):
+    """ Turns the values of the tubes into rows of database values, one tuple
+        per row in the order of columns.
+    """
+
+    def __init__(self, model, factory, connection):
+        self.connection = connection
+        self.table = model._meta.db_table
+        tubes = dict((field_name, generator) for field_name, generator, setter in factory['_plan'])
+        # (field, tube) pairs, fields without a tube get their default.
+        self.fields = []
+        for field in model._meta.local_concrete_fields:
+            tube = tubes.get(field.name)
+            if tube is None and isinstance(field, models.AutoField):
+                continue
+            self.fields.append((field, tube))
+        self.columns = [field.column for field, tube in self.fields]
+
+    def build(self, count):
+        columns = [self.column_values(field, tube, count) for field, tube in self.fields]
+        return zip(*columns)
+
+    def column_values(self, field, tube, count):
+        if tube is not None:
+            if hasattr(tube, 'next_batch'):
+                values = tube.next_batch(count)
+            else:
+                values = [tube.next() for i in xrange(count)]
+            if field.rel:
+                # A ForeignKey tube can yield objects or primary keys.
+                values = [value.pk if isinstance(value, models.Model) else value for value in values]
+        elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+            values = [field.pre_save(Holder(), True)] * count
+        elif callable(field.default):
+            values = [field.get_default() for i in xrange(count)]
+        else:
+            values = [field.get_default()] * count
+        prepare = field.get_db_prep_save
+        connection = self.connection
+        return [prepare(value, connection=connection) for value in values]
+
+
+def write_rows(connection, table, columns, rows):
+    """ Inserts rows, a list of tuples with the values of columns, into table. """
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(column) for column in columns)
+    cursor = connection.cursor()
+    try:
+        if connection.vendor == 'postgresql':
+            data = StringIO()
+            for row in rows:
+                data.write(','.join(copy_value(value) for value in row))
+                data.write('\n')
+            data.seek(0)
+            cursor.copy_expert('COPY %s (%s) FROM STDIN WITH CSV' % (quote(table), column_list), data)
+        else:
+            cursor.executemany('INSERT INTO %s (%s) VALUES (%s)' % (
+                quote(table), column_list, ', '.join(['%s'] * len(columns))), rows)
+    finally:
+        cursor.close()
+
+
+def copy_value(value):
+    """ Formats a value for a CSV COPY. NULL is an empty unquoted value, so
+        everything else is quoted.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif not isinstance(value, basestring):
+        value = unicode(value)
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return '"%s"' % value.replace('"', '""')
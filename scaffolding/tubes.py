@@ -2,23 +2,50 @@ from __future__ import absolute_import
 
 import os
 import random
-import re
-import urllib
+import colorsys
 import datetime
+import hashlib
 import string
-import time
 import pytz
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from scaffolding.library import lorem_ipsum
-from scaffolding.library.london_postcodes import postcodes
+from scaffolding.library.alias import AliasTable
+from scaffolding.library.london_postcodes import POSTCODES
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db.models.fields import FieldDoesNotExist
 from scaffolding.library.names import ENGLISH_MALE_NAMES, ENGLISH_FEMALE_NAMES
+from scaffolding.library.sentences import SentenceTable
 from scaffolding.library.url import TopUrl
 
+# The range of the integers numpy draws.
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def derive_seed(*parts):
+    """ Derives an independent, reproducible seed from the given parts. """
+    key = u':'.join(unicode(part) for part in parts).encode('utf-8')
+    return int(hashlib.sha1(key).hexdigest()[:16], 16)
+
 
 class Tube(object):
     """ The base class for scaffolding objects.
     """
+    # The random generator of the tube. The random module unless the tube is seeded.
+    random = random
+    # True if next() only depends on the random generator and has no other state.
+    stateless = False
+    # True if the values must not repeat between workers. The workers of
+    # unseeded runs then skip the rows before their share too.
+    disjoint = False
+
     def __init__(self, **kwargs):
         pass
 
@@ -33,23 +60,100 @@ class Tube(object):
     def next(self):
         raise NotImplementedError('You need to implement your own next method.')
 
+    def next_batch(self, n):
+        """ Returns a list with the next n values.
+            Override this if the tube can generate many values faster at once.
+        """
+        return [self.next() for i in xrange(n)]
+
+    def seed(self, seed):
+        """ Gives the tube its own random generator, so that its values can be
+            reproduced, and starts it from the beginning.
+        """
+        self.stream_seed = seed
+        self.random = random.Random(seed)
+        self.rewind()
+
+    def unseed(self):
+        """ Goes back to the random module after a seeded run. """
+        self.__dict__.pop('random', None)
+
+    def rewind(self):
+        """ Moves the tube back to its first value.
+            Override this if the values depend on the values before.
+        """
+
+    def seed_block(self, block):
+        """ Restarts the random generator of a seeded tube for a block of rows.
+            Every block can then be generated without generating the blocks before.
+        """
+        self.random.seed(derive_seed(self.stream_seed, block))
+
+    def skip(self, n):
+        """ Advances the tube as n calls of next() would.
+            Override this if the tube can skip values without generating them.
+        """
+        for i in xrange(n):
+            self.next()
+
 #---------- custom classes -----------------
 
 class StaticValue(Tube):
     """Always returns the same value"""
 
+    stateless = True
+
     def __init__(self, value):
         self.value = value
     def next(self):
         return self.value
+    def next_batch(self, n):
+        return [self.value] * n
 
 
 class RandomValue(Tube):
-    """Returns random values from the passed list"""
-    def __init__(self, lst):
+    """Returns random values from the passed list.
+    weights can give every value a weight, a value with twice the weight is
+    returned twice as often.
+    """
+    stateless = True
+    # The AliasTable of the weights.
+    table = None
+
+    def __init__(self, lst, weights=None):
         self.lst = lst
+        if weights is not None:
+            if len(weights) != len(lst):
+                raise ValueError('There must be a weight for every value.')
+            self.table = AliasTable(weights)
     def next(self):
-        return random.choice(self.lst)
+        if self.table is not None:
+            return self.lst[self.table.sample(self.random)]
+        return self.random.choice(self.lst)
+    def next_batch(self, n):
+        lst = self.lst
+        if self.table is not None:
+            if numpy is not None and self.random is random:
+                return [lst[i] for i in self.table.sample_numpy(n)]
+            return [lst[i] for i in self.table.sample_batch(self.random, n)]
+        if numpy is not None and self.random is random:
+            return [lst[i] for i in numpy.random.randint(0, len(lst), n)]
+        choice = self.random.choice
+        return [choice(lst) for i in xrange(n)]
+
+
+class WeightedChoice(RandomValue):
+    """ Returns random values of (value, weight) pairs, or of a dict with the
+        weights of the values. A value with twice the weight is returned twice
+        as often. Every value takes the same time, however many there are.
+    """
+
+    def __init__(self, choices):
+        if isinstance(choices, dict):
+            choices = choices.items()
+        choices = list(choices)
+        super(WeightedChoice, self).__init__([value for value, weight in choices],
+                                             [weight for value, weight in choices])
 
 
 class EveryValue(Tube):
@@ -67,6 +171,30 @@ class EveryValue(Tube):
         self.index += 1
         return self.values[self.index % self.length]
 
+    def next_batch(self, n):
+        if self.length == 0:
+            raise StopIteration
+        values, length = self.values, self.length
+        start = (self.index + 1) % length
+        self.index += n
+        end = start + n
+        if end <= length:
+            return values[start:end]
+        # Only the values of the batch are copied, whole loops and the rest.
+        batch = values[start:]
+        end -= length
+        while end > length:
+            batch.extend(values)
+            end -= length
+        batch.extend(values[:end])
+        return batch
+
+    def skip(self, n):
+        self.index += n
+
+    def rewind(self):
+        self.index = -1
+
 
 class OrNone(Tube):
     """
@@ -78,11 +206,26 @@ class OrNone(Tube):
 
 
     def next(self):
-        if random.random() > self.split:
+        if self.random.random() > self.split:
             return None
         else:
             return self.cls.next()
 
+    def seed(self, seed):
+        super(OrNone, self).seed(seed)
+        if hasattr(self.cls, 'seed'):
+            self.cls.seed(derive_seed(seed, 'cls'))
+
+    def seed_block(self, block):
+        super(OrNone, self).seed_block(block)
+        if hasattr(self.cls, 'seed_block'):
+            self.cls.seed_block(block)
+
+    def unseed(self):
+        super(OrNone, self).unseed()
+        if hasattr(self.cls, 'unseed'):
+            self.cls.unseed()
+
 
 class OrBlank(Tube):
     """
@@ -94,11 +237,246 @@ class OrBlank(Tube):
 
 
     def next(self):
-        if random.random() > self.split:
+        if self.random.random() > self.split:
             return ""
         else:
             return self.cls.next()
 
+    def seed(self, seed):
+        super(OrBlank, self).seed(seed)
+        if hasattr(self.cls, 'seed'):
+            self.cls.seed(derive_seed(seed, 'cls'))
+
+    def seed_block(self, block):
+        super(OrBlank, self).seed_block(block)
+        if hasattr(self.cls, 'seed_block'):
+            self.cls.seed_block(block)
+
+    def unseed(self):
+        super(OrBlank, self).unseed()
+        if hasattr(self.cls, 'unseed'):
+            self.cls.unseed()
+
+
+class Unique(Tube):
+    """ Yields values from the passed class that haven't been yielded before.
+        The class can also be a tube instance.
+        If the tube is set up for a field, the values already in the database
+        are loaded first. The values are remembered by a 64 bit hash. With
+        bloom_capacity (the expected number of values in the table) the values
+        of the database only go into a Bloom filter of that capacity, values
+        that might be in it are looked up in the database.
+        Gives up after max_attempts duplicates in a row.
+    """
+    # The share of duplicates among the last draws estimates how much of the
+    # value space is used.
+    window = 1000
+
+    def __init__(self, cls, max_attempts=100, bloom_capacity=None, preload=True, *args, **kwargs):
+        self.cls = cls if isinstance(cls, Tube) else cls(*args, **kwargs)
+        self.max_attempts = max_attempts
+        self.bloom_capacity = bloom_capacity
+        self.preload = preload
+        self.model = self.field_name = None
+        self.reset()
+
+    def reset(self):
+        from scaffolding.library.bloom import BloomFilter
+        # The hashes of the values of this tube and of the values of the database.
+        self.hashes = set()
+        self.loaded = set()
+        self.bloom = BloomFilter(self.bloom_capacity) if self.bloom_capacity else None
+        self.draws = deque(maxlen=self.window)
+        self.emitted = self.rejected = self.preloaded = 0
+
+    def set_up(self, cls, count, field_name=None, **kwargs):
+        if hasattr(self.cls, 'set_up'):
+            self.cls.set_up(cls, count, field_name=field_name, **kwargs)
+        self.reset()
+        if self.preload and field_name:
+            self.model, self.field_name = cls, field_name
+            values = cls._default_manager.values_list(field_name, flat=True).order_by()
+            for value in values.iterator():
+                if value is not None:
+                    self.add(value, preloaded=True)
+                    self.preloaded += 1
+
+    def key(self, value):
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+        if isinstance(value, (int, long)):
+            return str(value)
+        return value if isinstance(value, str) else repr(value)
+
+    def hash(self, key):
+        return hashlib.md5(key).digest()[:8]
+
+    def add(self, value, preloaded=False):
+        key = self.key(value)
+        if self.bloom is not None:
+            self.bloom.add(key)
+            if preloaded:
+                return
+        (self.loaded if preloaded else self.hashes).add(self.hash(key))
+
+    def seen(self, value):
+        key = self.key(value)
+        if self.bloom is not None and key not in self.bloom:
+            return False
+        value_hash = self.hash(key)
+        if value_hash in self.hashes or value_hash in self.loaded:
+            return True
+        if self.bloom is None or self.model is None:
+            return False
+        # The Bloom filter can be wrong, the database knows.
+        return self.model._default_manager.filter(**{self.field_name: value}).exists()
+
+    def next(self):
+        for attempt in xrange(self.max_attempts):
+            value = self.cls.next()
+            if value is None:
+                # NULL is never a duplicate.
+                return value
+            duplicate = self.seen(value)
+            self.draws.append(duplicate)
+            if not duplicate:
+                self.add(value)
+                self.emitted += 1
+                return value
+            self.rejected += 1
+        raise ValueError(u'%s found no new value in %s attempts. %s' % (
+            self.cls.__class__.__name__, self.max_attempts, self.report()))
+
+    def skip(self, n):
+        """ Replays n values of the passed class, rejecting what next() would
+            have rejected. The replayed values are usually already in the
+            database when a run is resumed, so only the values of this tube
+            count as duplicates, not the ones loaded from the database.
+        """
+        for i in xrange(n):
+            for attempt in xrange(self.max_attempts):
+                value = self.cls.next()
+                if value is None:
+                    break
+                if self.hash(self.key(value)) not in self.hashes:
+                    self.add(value)
+                    break
+            else:
+                raise ValueError(u'%s found no new value in %s attempts while skipping %s values.' % (
+                    self.cls.__class__.__name__, self.max_attempts, n))
+
+    def used_share(self):
+        """ Estimates the share of the value space that is used, from the share
+            of duplicates among the last draws.
+        """
+        return sum(self.draws) / float(len(self.draws)) if self.draws else 0.0
+
+    def report(self):
+        return u'%s new values, %s from the database, %s duplicates rejected, about %.0f%% of the values are used.' % (
+            self.emitted, self.preloaded, self.rejected, self.used_share() * 100)
+
+    def seed(self, seed):
+        super(Unique, self).seed(seed)
+        if hasattr(self.cls, 'seed'):
+            self.cls.seed(derive_seed(seed, 'cls'))
+
+    def seed_block(self, block):
+        super(Unique, self).seed_block(block)
+        if hasattr(self.cls, 'seed_block'):
+            self.cls.seed_block(block)
+
+    def unseed(self):
+        super(Unique, self).unseed()
+        if hasattr(self.cls, 'unseed'):
+            self.cls.unseed()
+
+
+class Template(Tube):
+    """ Fills a template with the values of tubes. templates is a list of format
+        strings, or of (format string, weight) pairs, whose placeholders are
+        the names of the tubes:
+
+            Template(['{number} {street} Street', ('{number} High Street', 2)],
+                     number=RandInt(1, 100), street=LastName())
+
+        The template is chosen first, then only its placeholders pull a value,
+        one per placeholder, so '{street} and {street}' gets two streets. The
+        filled template is cut to max_length.
+    """
+
+    def __init__(self, templates, max_length=None, **tubes):
+        super(Template, self).__init__()
+        self.max_length = max_length
+        self.tubes = tubes
+        self.templates = []
+        weights = []
+        for template in templates:
+            if isinstance(template, basestring):
+                template = (template, 1)
+            template, weight = template
+            self.templates.append(self.compile(template))
+            weights.append(weight)
+        self.table = AliasTable(weights)
+
+    def compile(self, template):
+        """ Returns template as a %-format string and the placeholders that fill it. """
+        parts = []
+        fields = []
+        for literal, name, spec, conversion in TEMPLATE_FORMATTER.parse(template):
+            parts.append(literal.replace('%', '%%'))
+            if name is None:
+                continue
+            if name not in self.tubes:
+                raise ValueError('There is no tube for {%s} in %r.' % (name, template))
+            parts.append('%s')
+            fields.append((name, conversion, spec))
+        return u''.join(parts), fields
+
+    @property
+    def stateless(self):
+        return all(getattr(tube, 'stateless', False) for tube in self.tubes.values())
+
+    def set_up(self, cls, count, **kwargs):
+        for tube in self.tubes.values():
+            if hasattr(tube, 'set_up'):
+                tube.set_up(cls, count, **kwargs)
+
+    def next(self):
+        format, fields = self.templates[self.table.sample(self.random)]
+        tubes = self.tubes
+        values = []
+        for name, conversion, spec in fields:
+            value = tubes[name].next()
+            if conversion:
+                value = TEMPLATE_FORMATTER.convert_field(value, conversion)
+            if spec:
+                value = TEMPLATE_FORMATTER.format_field(value, spec)
+            values.append(value)
+        value = format % tuple(values)
+        if self.max_length is not None:
+            return value[:self.max_length]
+        return value
+
+    def seed(self, seed):
+        super(Template, self).seed(seed)
+        for name, tube in self.tubes.items():
+            if hasattr(tube, 'seed'):
+                tube.seed(derive_seed(seed, name))
+
+    def seed_block(self, block):
+        super(Template, self).seed_block(block)
+        for tube in self.tubes.values():
+            if hasattr(tube, 'seed_block'):
+                tube.seed_block(block)
+
+    def unseed(self):
+        super(Template, self).unseed()
+        for tube in self.tubes.values():
+            if hasattr(tube, 'unseed'):
+                tube.unseed()
+
+TEMPLATE_FORMATTER = string.Formatter()
+
 
 class Name(Tube):
     """ Generates a random name. <gender> can be 'male', 'female', 'm' or 'f'.
@@ -107,11 +485,31 @@ class Name(Tube):
         from scaffolding.library import names
         super(Name, self).__init__(**kwargs)
         self.max_length = max_length
+        self.gender = gender
         self.first_names = names.FirstNames(gender=gender)
         self.last_names = names.LastNames()
 
     def next(self):
-        return u'%s %s'[:self.max_length] % (self.first_names.next(), self.last_names.next())
+        return (u'%s %s' % (self.first_names.next(), self.last_names.next()))[:self.max_length]
+
+    def seed(self, seed):
+        from scaffolding.library import names
+        super(Name, self).seed(seed)
+        # The order of the first names is shuffled, it has to be reproducible too.
+        self.first_names = names.FirstNames(gender=self.gender, rng=self.random)
+
+    def unseed(self):
+        from scaffolding.library import names
+        super(Name, self).unseed()
+        self.first_names = names.FirstNames(gender=self.gender)
+
+    def rewind(self):
+        self.first_names.index = 0
+        self.last_names.index = 0
+
+    def skip(self, n):
+        self.first_names.index += n
+        self.last_names.index += n
 
 
 class ProductCategory(Tube):
@@ -122,79 +520,50 @@ class ProductCategory(Tube):
         self.categories = names.ProductCategories()
 
     def next(self):
-        return u'%s'[:self.max_length] % (self.categories.next())
+        return (u'%s' % self.categories.next())[:self.max_length]
+
+    def skip(self, n):
+        self.categories.index += n
+
+    def rewind(self):
+        self.categories.index = 0
 
 
 class FirstName(Name):
     """ Only returns first names. """
     def next(self):
-        return u'%s'[:self.max_length] % self.first_names.next()
+        return (u'%s' % self.first_names.next())[:self.max_length]
 
 
 class LastName(Name):
     """ Only returns last names. """
     def next(self):
-        return u'%s'[:self.max_length] % self.last_names.next()
+        return (u'%s' % self.last_names.next())[:self.max_length]
 
 
-class ProductName(Tube):
+class ProductName(Template):
     """ Generates some plausible product names. """
+    templates = [u'{company} {code}']
+    codes = [u'{letter}{letter}{digit}{digit}{digit}{digit}', u'{letter}{letter}{digit}',
+             u'{letter}{letter}', u'{digit}{digit}{letter}{letter}']
 
-    def __init__(self, **kwargs):
-        from scaffolding.library import names
+    def __init__(self, max_length=None, **kwargs):
         from .library.names import Companies
-        from scaffolding.library.booktitles import NOUNS
-        super(ProductName, self).__init__(**kwargs)
-        self.nouns = NOUNS
-        self.companies = Companies()
-        self.last_names = names.LastNames()
-
-    def get_letter(self, count):
-        return ''.join([chr(random.randrange(65, 65 + 26)) for x in range(0,count)])
+        code = Template(self.codes, letter=RandomValue(string.ascii_uppercase),
+                        digit=RandomValue(string.digits))
+        super(ProductName, self).__init__(self.templates, max_length,
+                                          company=RandomValue(Companies()()), code=code)
 
-    def get_number(self, count):
-        return ''.join([chr(random.randrange(48, 48 + 10)) for x in range(0,count)])
 
-    def get_name(self):
-        return self.last_names.next()
-
-    def get_noun(self):
-        return random.choice(self.nouns)
-
-    def get_company(self):
-        return random.choice(self.companies())
-
-    def get_code(self):
-        return random.choice([
-            self.get_letter(2)+self.get_number(4),
-            self.get_letter(2)+self.get_number(1),
-            self.get_letter(2),
-            self.get_number(2)+self.get_letter(2),
-        ])
-
-    def next(self):
-        return random.choice([
-            '%s %s' % (self.get_company(), self.get_code()),
-            # '%s %s %s' % (self.get_name(), self.get_noun(), self.get_code()),
-            # '%s %s %s' % (self.get_name(), self.get_code(), self.get_noun()),
-        ])
-
-
-class CompanyName(Name):
+class CompanyName(Template):
     """ Generates some plausible company names. """
+    templates = [u'{name} and {name}', u'{name}-{name}', u'{name} Ltd.', u'{name} and Son',
+                 u'{name} Inc.', u'{word}']
 
-    def get_name(self):
-        return u'%s' % self.last_names.next()
-
-    def next(self):
-        return random.choice([
-            '%s and %s' % (self.get_name(), self.get_name())[:self.max_length],
-            '%s-%s' % (self.get_name(), self.get_name())[:self.max_length],
-            '%s Ltd.' % (self.get_name(),)[:self.max_length],
-            '%s and Son' % (self.get_name())[:self.max_length],
-            '%s Inc.' % (self.get_name())[:self.max_length],
-            random.choice(lorem_ipsum.LOREM_IPSUM[0].split()).title(),
-        ])
+    def __init__(self, max_length=30, **kwargs):
+        words = [word.title() for word in lorem_ipsum.LOREM_IPSUM[0].split()]
+        super(CompanyName, self).__init__(self.templates, max_length,
+                                          name=LastName(max_length=None), word=RandomValue(words))
 
 
 class RealCompanyName(RandomValue):
@@ -204,51 +573,48 @@ class RealCompanyName(RandomValue):
         self.lst = companies()
 
 
-class StreetAddress(Name):
+class StreetAddress(Template):
     """ Generates some plausible street addresses. """
+    templates = [u'{number} {name} Street', u'{number} {name} Road', u'{number} High Street',
+                 u'{number} {name} Hill', u'{number} Upper {name} Street',
+                 u'{number} {name} House, {name} Road']
 
-    def get_name(self):
-        return u'%s' % self.last_names.next()
-
-    def get_int(self):
-        return str(random.randint(1,100))
-
-    def next(self):
-        return random.choice([
-            '%s %s Street' % (self.get_int(), self.get_name())[:self.max_length],
-            '%s %s Road' % (self.get_int(), self.get_name())[:self.max_length],
-            '%s High Street' % (self.get_int(), )[:self.max_length],
-            '%s %s Hill' % (self.get_int(), self.get_name())[:self.max_length],
-            '%s Upper %s Street' % (self.get_int(), self.get_name())[:self.max_length],
-            '%s %s House, %s Road' % (self.get_int(), self.get_name(), self.get_name())[:self.max_length],
-        ])
+    def __init__(self, max_length=30, **kwargs):
+        super(StreetAddress, self).__init__(self.templates, max_length,
+                                            number=RandInt(1, 100), name=LastName(max_length=None))
 
 
 class Noun(Tube):
+    stateless = True
+
     def __init__(self, **kwargs):
         from scaffolding.library.booktitles import NOUNS
         self.nouns = NOUNS
 
     def next(self):
-        return random.choice(self.nouns)
+        return self.random.choice(self.nouns)
 
 
 class Verb(Tube):
+    stateless = True
+
     def __init__(self, **kwargs):
         from scaffolding.library.booktitles import VERBS
         self.verbs = VERBS
 
     def next(self):
-        return random.choice(self.verbs)
+        return self.random.choice(self.verbs)
 
 
 class Word(Tube):
+    stateless = True
+
     def __init__(self, **kwargs):
         from scaffolding.library.booktitles import VERBS, NOUNS
         self.words = VERBS + NOUNS
 
     def next(self):
-        return random.choice(self.words)
+        return self.random.choice(self.words)
 
 
 class RandomEmail(Tube):
@@ -257,12 +623,31 @@ class RandomEmail(Tube):
     def __init__(self, length=8, domains=None):
         self.index = -1
         self.length = length
-        self.domains = domains or TopUrl()()
+        self.source_domains = domains or TopUrl()()
+        self.shuffle(random)
+
+    def shuffle(self, rng):
+        # Copies, the shared datasets are immutable.
+        self.domains = list(self.source_domains)
         self.names = ENGLISH_MALE_NAMES + ENGLISH_FEMALE_NAMES
         self.num_names = len(self.names)
         self.num_domains = len(self.domains)
-        random.shuffle(self.names)
-        random.shuffle(self.domains)
+        rng.shuffle(self.names)
+        rng.shuffle(self.domains)
+
+    def seed(self, seed):
+        super(RandomEmail, self).seed(seed)
+        self.shuffle(self.random)
+
+    def unseed(self):
+        super(RandomEmail, self).unseed()
+        self.shuffle(random)
+
+    def rewind(self):
+        self.index = -1
+
+    def skip(self, n):
+        self.index += n
 
     def next(self):
         if self.length == 0:
@@ -275,6 +660,8 @@ class RandomEmail(Tube):
 
 
 class BookTitle(Tube):
+    stateless = True
+
     def __init__(self, **kwargs):
         from scaffolding.library import booktitles
         super(BookTitle, self).__init__(**kwargs)
@@ -283,81 +670,112 @@ class BookTitle(Tube):
     def next(self):
         return self.title.next()
 
+    def seed(self, seed):
+        super(BookTitle, self).seed(seed)
+        self.title.random = self.random
+
+    def unseed(self):
+        super(BookTitle, self).unseed()
+        self.title.__dict__.pop('random', None)
+
 
 class LoremIpsum(Tube):
     """ Generates a Lorem Ipsum Text. The number of paragraphs is defined in paragraphs.
+        The text is cut after max_length characters and max_words words, only
+        that much of it is put together. Without max_length the max_length of
+        the field is used.
     """
-    def __init__(self, paragraphs=7, max_length=None, text=lorem_ipsum.LOREM_IPSUM, **kwargs):
+    stateless = True
+
+    def __init__(self, paragraphs=7, max_length=None, text=lorem_ipsum.LOREM_IPSUM, max_words=None,
+                 **kwargs):
         super(LoremIpsum, self).__init__(**kwargs)
         self.text = text
+        self.table = SentenceTable.for_text(text)
         self.max_length = max_length
+        self.max_words = max_words
         self.paragraphs = paragraphs
         #  TODO: Loop paragraphs.
-        if self.paragraphs > len(self.text):
+        if self.paragraphs > len(self.table):
             raise AttributeError('The Text %s only has %s paragraphs' %(text, len(text)))
 
+    def set_up(self, cls, count, **kwargs):
+        if self.max_length is None and kwargs.get('field_name'):
+            try:
+                self.max_length = cls._meta.get_field(kwargs['field_name']).max_length
+            except FieldDoesNotExist:
+                pass
+
     def next(self):
-        if self.paragraphs < len(self.text):
-            late_start = len(self.text) - self.paragraphs - 1
-            start = random.randint(0, late_start)
+        if self.paragraphs < len(self.table):
+            late_start = len(self.table) - self.paragraphs - 1
+            start = self.random.randint(0, late_start)
         else:
             start = 0
-        text = u'\n\n'.join(self.text[start:(start+self.paragraphs)])
-        if self.max_length:
-            return text[:self.max_length]
-        return text
+        return self.table.paragraphs(start, self.paragraphs, self.max_length, self.max_words)
 
 
-class RandomLoremIpsum(Tube):
-    """ Generates a Lorem Ipsum Text. The number of paragraphs is defined in paragraphs.
+class RandomLoremIpsum(LoremIpsum):
+    """ Generates a Lorem Ipsum Text from paragraphs random paragraphs of the text,
+        with their sentences in random order.
     """
-    def __init__(self, paragraphs=7, max_length=None, text=lorem_ipsum.LOREM_IPSUM, **kwargs):
-        super(RandomLoremIpsum, self).__init__(**kwargs)
-        random.shuffle(text)
-        self.text = text
-        for item in self.text:
-            sentences = re.split(r' *[\.\?!][\'"\)\]]* *', item)
-            random.shuffle(sentences)
-            item = ''.join(sentences)
-
-        self.max_length = max_length
-        self.paragraphs = paragraphs
-        #  TODO: Loop paragraphs.
-        if self.paragraphs > len(self.text):
-            raise AttributeError('The Text %s only has %s paragraphs' %(text, len(text)))
 
     def next(self):
-        if self.paragraphs < len(self.text):
-            late_start = len(self.text) - self.paragraphs - 1
-            start = random.randint(0, late_start)
-        else:
-            start = 0
-        text = u'\n\n'.join(self.text[start:(start+self.paragraphs)])
-        if self.max_length:
-            return text[:self.max_length]
-        return text
+        table = self.table
+        paragraphs = self.shuffled(xrange(len(table)), self.paragraphs)
+        return table.join((self.shuffled(table.sentences(paragraph)) for paragraph in paragraphs),
+                          self.max_length, self.max_words)
+
+    def shuffled(self, items, count=None):
+        """ Yields count of the items in random order. Only the items that are
+            consumed are drawn.
+        """
+        items = list(items)
+        length = len(items)
+        random = self.random.random
+        for i in xrange(length if count is None else count):
+            j = i + int(random() * (length - i))
+            items[i], items[j] = items[j], items[i]
+            yield items[i]
 
 
 class RandInt(Tube):
     """ Generates a random integer between min and max """
+    stateless = True
+
     def __init__(self, min, max, **kwargs):
         super(RandInt, self).__init__(**kwargs)
         self.min = min
         self.max = max
 
     def next(self):
-        return random.randint(self.min, self.max)
+        return self.random.randint(self.min, self.max)
+
+    def next_batch(self, n):
+        # numpy only draws integers that fit into 64 bits.
+        if numpy is not None and self.random is random and INT64_MIN <= self.min and self.max <= INT64_MAX:
+            return numpy.random.randint(self.min, self.max + 1, n, dtype=numpy.int64).tolist()
+        randint, low, high = self.random.randint, self.min, self.max
+        return [randint(low, high) for i in xrange(n)]
 
 
 class RandFloat(Tube):
     """ Generates a random float between min and max """
+    stateless = True
+
     def __init__(self, min, max, **kwargs):
         super(RandFloat, self).__init__(**kwargs)
         self.min = min
         self.max = max
 
     def next(self):
-        return random.uniform(self.min, self.max)
+        return self.random.uniform(self.min, self.max)
+
+    def next_batch(self, n):
+        if numpy is not None and self.random is random:
+            return numpy.random.uniform(self.min, self.max, n).tolist()
+        uniform, low, high = self.random.uniform, self.min, self.max
+        return [uniform(low, high) for i in xrange(n)]
 
 
 class Contrib(object):
@@ -373,12 +791,40 @@ class Contrib(object):
     def next(self):
         return self.backend.next()
 
+    def next_batch(self, n):
+        if hasattr(self.backend, 'next_batch'):
+            return self.backend.next_batch(n)
+        return [self.backend.next() for i in xrange(n)]
+
     def set_up(self, cls, count, **kwargs):
         if hasattr(self.backend, 'set_up'):
             self.backend.set_up(cls, count, **kwargs)
         else:
             pass
 
+    @property
+    def stateless(self):
+        return getattr(self.backend, 'stateless', False)
+
+    def seed(self, seed):
+        if hasattr(self.backend, 'seed'):
+            self.backend.seed(seed)
+
+    def seed_block(self, block):
+        if hasattr(self.backend, 'seed_block'):
+            self.backend.seed_block(block)
+
+    def unseed(self):
+        if hasattr(self.backend, 'unseed'):
+            self.backend.unseed()
+
+    def skip(self, n):
+        if hasattr(self.backend, 'skip'):
+            self.backend.skip(n)
+        else:
+            for i in xrange(n):
+                self.backend.next()
+
 
 class AlwaysTrue(StaticValue):
     """ Always returns True."""
@@ -392,43 +838,152 @@ class AlwaysFalse(StaticValue):
         self.value = False
 
 
-class TrueOrFalse(RandomValue):
+class TrueOrFalse(WeightedChoice):
     """ Randomly returns true or false.
         You can set a ratio for true or false by specifying true and false:
         e.g. true=1, false=3 returns 3 times as many False than Trues.
     """
     def __init__(self, true=1, false=1):
-        self.lst = [True for i in range(true)]
-        self.lst.extend([False for i in range(false)])
+        super(TrueOrFalse, self).__init__([(True, true), (False, false)])
+        self.true = true
+        self.false = false
 
 
 class RandomInternetImage(Tube):
     """ Creates a random image for an ImageField using an internet source.
+        Up to prefetch upcoming images are downloaded by a pool of threads.
+        The downloads are kept in a DownloadCache of max_cache_size bytes in
+        cache_dir, so repeated runs don't download the same URLs again.
     """
-    def __init__(self, backend, **kwargs):
+    def __init__(self, backend, threads=4, prefetch=8, cache_dir=None,
+                 max_cache_size=100 * 1024 * 1024, **kwargs):
+        from scaffolding.library.downloads import DownloadCache
         super(RandomInternetImage, self).__init__(**kwargs)
         self.backend = backend(**kwargs)
+        self.cache = DownloadCache(cache_dir=cache_dir, max_size=max_cache_size)
+        self.threads = threads
+        self.prefetch = max(prefetch, 1)
+        self.pending = deque()
+        self.exhausted = False
+        # Created on first use, threads don't survive forking into worker processes.
+        self.pool = None
+
+    def _fill(self):
+        if self.pool is None:
+            self.pool = ThreadPool(self.threads)
+        while not self.exhausted and len(self.pending) < self.prefetch:
+            try:
+                url = self.backend.next()
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.pending.append((url, self.pool.apply_async(self.cache.open, (url,))))
+
+    def next(self):
+        # returns a filename and File object, ready to be fed to the image.save() method.
+        self._fill()
+        if not self.pending:
+            raise StopIteration
+        url, download = self.pending.popleft()
+        image = download.get()
+        self._fill()
+        return os.path.basename(url), File(image)
+
+    def skip(self, n):
+        # Skip the URLs without downloading them.
+        while n and self.pending:
+            self.pending.popleft()
+            n -= 1
+        for i in xrange(n):
+            self.backend.next()
+
+
+class PlaceholderImage(Tube):
+    """ Creates placeholder images for an ImageField without network access.
+        pool_size images with different background colours are rendered once
+        and handed out in turn. text is drawn on the image and can use the
+        {width}, {height} and {index} placeholders. Requires Pillow.
+    """
+    EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif'}
+
+    def __init__(self, width=640, height=480, format='PNG', text=u'{width}x{height}',
+                 pool_size=10, **kwargs):
+        super(PlaceholderImage, self).__init__(**kwargs)
+        self.width = width
+        self.height = height
+        self.format = format.upper()
+        self.extension = self.EXTENSIONS.get(self.format, self.format.lower())
+        self.text = text
+        self.pool_size = max(pool_size, 1)
+        self.pool = None
+        self.index = -1
+
+    def render(self, index):
+        from PIL import Image, ImageDraw
+        from io import BytesIO
+
+        # Spread the background colours over the hue circle.
+        red, green, blue = colorsys.hsv_to_rgb(float(index) / self.pool_size, 0.5, 0.8)
+        image = Image.new('RGB', (self.width, self.height),
+                          (int(red * 255), int(green * 255), int(blue * 255)))
+        if self.text:
+            text = self.text.format(width=self.width, height=self.height, index=index + 1)
+            draw = ImageDraw.Draw(image)
+            text_width, text_height = draw.textsize(text)
+            draw.text(((self.width - text_width) / 2, (self.height - text_height) / 2),
+                      text, fill=(255, 255, 255))
+        output = BytesIO()
+        image.save(output, self.format)
+        return output.getvalue()
 
     def next(self):
         # returns a filename and File object, ready to be fed to the image.save() method.
-        url = self.backend.next()
-        temp_image = urllib.urlretrieve(url)
-        return os.path.basename(url), File(open(temp_image[0]))
+        if self.pool is None:
+            self.pool = [self.render(i) for i in range(self.pool_size)]
+        self.index = (self.index + 1) % self.pool_size
+        return (u'placeholder-%s.%s' % (self.index + 1, self.extension),
+                ContentFile(self.pool[self.index]))
+
+    def skip(self, n):
+        self.index = (self.index + n) % self.pool_size
+
+    def rewind(self):
+        self.index = -1
 
 
 class ForeignKey(EveryValue):
     """ Creates a foreign key assigning items from the queryset.
+        The first chunksize items are fetched once on first use and then looped
+        through. With pk_only=True only their primary keys are fetched.
+        Unordered querysets are ordered by primary key, so every process gets
+        the same items in the same order.
+        Call refresh() to fetch them again.
     """
-    def __init__(self, queryset, chunksize=100, **kwargs):
+    def __init__(self, queryset, chunksize=100, pk_only=False, **kwargs):
         self.index = -1
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
         self.queryset = queryset[:chunksize]
+        self.pk_only = pk_only
+        self.values = None
+        self.length = 0
+
+    def refresh(self):
+        if self.pk_only:
+            self.values = list(self.queryset.values_list('pk', flat=True))
+        else:
+            self.values = list(self.queryset)
+        self.length = len(self.values)
 
     def next(self):
-        length = self.queryset.count()
-        if length == 0:
-            raise StopIteration
-        self.index += 1
-        return self.queryset[self.index % length]
+        if self.values is None:
+            self.refresh()
+        return super(ForeignKey, self).next()
+
+    def next_batch(self, n):
+        if self.values is None:
+            self.refresh()
+        return super(ForeignKey, self).next_batch(n)
 
 
 class ForeignKeyOrNone(OrNone):
@@ -441,6 +996,8 @@ class ForeignKeyOrNone(OrNone):
 
 class RandomDate(Tube):
     """ Creates a date between startdate and enddate  """
+    stateless = True
+
     def __init__(self, startdate, enddate, **kwargs):
         super(RandomDate, self).__init__(**kwargs)
         if not (isinstance(startdate, datetime.date) and
@@ -456,7 +1013,17 @@ class RandomDate(Tube):
 
     def next(self):
         delta = (self.enddate - self.startdate).days
-        return self.startdate + datetime.timedelta(random.randint(0, delta))
+        return self.startdate + datetime.timedelta(self.random.randint(0, delta))
+
+    def next_batch(self, n):
+        delta = (self.enddate - self.startdate).days
+        if numpy is not None and self.random is random:
+            days = numpy.random.randint(0, delta + 1, n, dtype=numpy.int64).tolist()
+        else:
+            randint = self.random.randint
+            days = [randint(0, delta) for i in xrange(n)]
+        startdate, timedelta = self.startdate, datetime.timedelta
+        return [startdate + timedelta(d) for d in days]
 
 
 class RandomDateTime(RandomDate):
@@ -464,9 +1031,20 @@ class RandomDateTime(RandomDate):
     def next(self):
         new_date = super(RandomDateTime, self).next()
         new_datetime = datetime.datetime.combine(new_date, datetime.time())
-        new_datetime += datetime.timedelta(minutes=random.randint(0, 3)*15)
+        new_datetime += datetime.timedelta(minutes=self.random.randint(0, 3)*15)
         return pytz.utc.localize(new_datetime)
 
+    def next_batch(self, n):
+        if self.random is not random:
+            # A seeded tube has to draw the values in the same order as next().
+            return Tube.next_batch(self, n)
+        dates = super(RandomDateTime, self).next_batch(n)
+        quarters = RandInt(0, 3).next_batch(n)
+        combine, midnight, timedelta = datetime.datetime.combine, datetime.time(), datetime.timedelta
+        localize = pytz.utc.localize
+        return [localize(combine(d, midnight) + timedelta(minutes=q * 15))
+                for d, q in zip(dates, quarters)]
+
 
 def base36encode(number, alphabet='0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
     """Converts an integer to a base36 string."""
@@ -486,14 +1064,52 @@ def base36encode(number, alphabet='0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
 
 
 class UniqueCode(Tube):
-    """ Generates a (probably) unique uppercase alphanumeric code. max length is 9"""
-    def __init__(self, max_length=9):
-        self.max_length = max_length if max_length<=9 else 9
+    """ Generates unique uppercase alphanumeric codes of max_length characters.
+        The codes are a keyed permutation of a counter, so none repeats before
+        all 36 ** max_length codes are used, but they don't look sequential.
+        Runs without a key or a seed get a random key.
+    """
+    disjoint = True
+    rounds = 4
+
+    def __init__(self, max_length=9, key=None):
+        self.max_length = max_length
+        self.size = 36 ** max_length
+        # The Feistel network works on the code space split into two halves of
+        # digits, so it permutes exactly the 36 ** max_length codes.
+        self.high = 36 ** ((max_length + 1) // 2)
+        self.low = 36 ** (max_length // 2)
+        self.index = 0
+        self.set_key(key if key is not None else random.SystemRandom().getrandbits(64))
+
+    def set_key(self, key):
+        self.round_keys = [derive_seed(key, i) for i in range(self.rounds)]
+
+    def seed(self, seed):
+        super(UniqueCode, self).seed(seed)
+        self.set_key(seed)
+
+    def rewind(self):
+        # The key stays after a seeded run, so the codes after it are new ones.
+        self.index = 0
+
+    def permute(self, value):
+        high, low = self.high, self.low
+        for round_key in self.round_keys:
+            left, right = divmod(value, low)
+            mixed = (right ^ round_key) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF
+            value = high * right + (left + (mixed ^ (mixed >> 29))) % high
+        return value
 
     def next(self):
-        t = int(time.time()*10000)
-        str = base36encode(t)
-        return str[-self.max_length:]
+        if self.index >= self.size:
+            raise StopIteration
+        code = self.permute(self.index)
+        self.index += 1
+        return base36encode(code).rjust(self.max_length, '0')
+
+    def skip(self, n):
+        self.index += n
 
 
 class USCity(RandomValue):
@@ -521,26 +1137,30 @@ class UKPhone(Tube):
     """ Generates a valid UK phone number without the country code
     London only at the moment
     """
+    stateless = True
+
     def __init__(self):
         self.max_length = 13
 
     def next(self):
-        return '020 {:04d} {:04d}'.format(random.randint(0, 9999), random.randint(0, 99))
+        return '020 {:04d} {:04d}'.format(self.random.randint(0, 9999), self.random.randint(0, 99))
 
 
 class LondonPostcode(Tube):
     """ Returns a list of London Postcodes (i.e. WC1)"""
+    stateless = True
 
     def __init__(self):
-        self.postcodes = postcodes
+        self.districts = [district for district, weight in POSTCODES]
+        self.table = AliasTable([weight for district, weight in POSTCODES])
 
     def next(self):
-        letters = string.ascii_letters[26:]
+        letters = string.ascii_uppercase
         return "%s %s%s%s" % (
-            random.choice(self.postcodes),
-            random.randint(1,9),
-            random.choice(letters),
-            random.choice(letters)
+            self.districts[self.table.sample(self.random)],
+            self.random.randint(1,9),
+            self.random.choice(letters),
+            self.random.choice(letters)
         )
 
 
@@ -562,6 +1182,8 @@ class Callable(Tube):
 
 class OtherField(Tube):
     """ Sets a field based on the value of another field """
+    stateless = True
+
     def __init__(self, field, fn):
         self.field = field
         self.fn = fn